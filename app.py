@@ -1,33 +1,209 @@
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, abort, send_file
 from flask_cors import CORS
+from jinja2 import meta as jinja_meta
+from werkzeug.security import safe_join
 from functools import wraps
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import ast
+import atexit
+import base64
+import gzip
 import json
 import os
 import hashlib
+import hmac
+import importlib.util
+import math
+import mimetypes
+import re
+import mmap
+import queue
+import sqlite3
+import sys
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from assets import BundledTemplateLoader, DIST_DIR as ASSETS_DIR, MANIFEST_FILE as ASSETS_MANIFEST
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 app = Flask(__name__)
 app.secret_key = 'keyhere'
 CORS(app)
 
+# HTTP caching policies
+CACHE_CONTROL_STATIC = 'public, max-age=86400'  # reference data (elements)
+CACHE_CONTROL_PLUGIN = 'public, max-age=3600'  # plugin content, changes with version
+CACHE_CONTROL_REVALIDATE = 'no-cache'  # editable data, always revalidated by ETag
+CACHE_CONTROL_IMMUTABLE = 'public, max-age=31536000, immutable'  # content-hashed bundles
+
+# Serve inline template scripts/styles from the bundles built by assets.py
+ASSET_BUNDLES = os.environ.get('CHEMCENTER_ASSETS', '1') == '1'
+if ASSET_BUNDLES:
+    app.jinja_loader = BundledTemplateLoader(Path(app.root_path) / app.template_folder)
+
 # Configuration
 PLUGINS_DIR = Path('plugins')
 DATA_DIR = Path('data')
 DATA_DIR.mkdir(exist_ok=True)
 PLUGINS_DIR.mkdir(exist_ok=True)
-
+# Plugins imported at startup instead of on first use ('*' for all)
+PLUGIN_WARMUP = [name.strip() for name in os.environ.get('CHEMCENTER_PLUGIN_WARMUP', '').split(',')
+                 if name.strip()]
+# Reload changed plugin directories without a restart
+PLUGIN_WATCH = os.environ.get('CHEMCENTER_PLUGIN_WATCH', '1') == '1'
+PLUGIN_WATCH_INTERVAL = 2.0  # seconds between plugin directory scans
+TEMPLATES_DIR = Path('templates')
+
+CONFIG_FILE = DATA_DIR / 'config.json'
+CONFIG_CHECK_INTERVAL = 1.0  # seconds between config.json stat() checks
+# Share config writes between workers through a memory-mapped counter
+CONFIG_NOTIFY = os.environ.get('CHEMCENTER_CONFIG_NOTIFY', '') == '1'
+CONFIG_NOTIFY_FALLBACK = 30.0  # seconds between stat() checks in notify mode
+
+# Storage backend: 'json' (data files, default) or 'sqlite'
+STORAGE_BACKEND = os.environ.get('CHEMCENTER_STORAGE', 'json')
+SQLITE_FILE = DATA_DIR / 'chemcenter.db'
+SQLITE_BUSY_TIMEOUT = 5000  # ms to wait for a concurrent writer
+SQLITE_STATEMENT_CACHE = 64  # prepared statements kept per connection
+
+USERS_FILE = DATA_DIR / 'users.json'
 STATS_FILE = DATA_DIR / 'visits.json'
+POSTS_FILE = DATA_DIR / 'posts.json'  # legacy storage, migrated into POSTS_LOG
+POSTS_LOG = DATA_DIR / 'posts.ndjson'
+POSTS_IMPORT_BATCH = 500  # posts appended per write during bulk import
+
+RESULT_CACHE_SIZE = 2048  # memoized plugin results (LRU)
+RESULT_CACHE_TTL = 3600  # seconds
+PAGE_CACHE_SIZE = 256  # rendered HTML pages (LRU)
+COMPRESS_MIN_SIZE = 1024  # bytes; smaller responses are sent as is
+COMPRESS_CACHE_SIZE = 512  # compressed bodies of ETag-ed responses (LRU)
+COMPRESS_MIMETYPES = {'application/json', 'application/javascript', 'image/svg+xml'}
+BATCH_MAX_ITEMS = 500  # inputs accepted by one /api/plugin/<name>/batch request
+VISITS_DIR = DATA_DIR / 'visits'
+VISIT_RETENTION_DAYS = 30
+VISIT_FLUSH_SIZE = 50  # visits buffered before an append
+VISIT_FLUSH_INTERVAL = 5  # seconds
+VISIT_COMPACT_INTERVAL = 3600  # seconds
+VISIT_QUEUE_SIZE = 10000  # visits waiting for the background writer
+# Full queue: 'drop' the new visit at once, or 'block' up to VISIT_QUEUE_TIMEOUT first
+VISIT_QUEUE_POLICY = os.environ.get('CHEMCENTER_VISIT_QUEUE_POLICY', 'drop')
+VISIT_QUEUE_TIMEOUT = 0.05  # seconds
+
+PASSWORD_SCRYPT = (2 ** 14, 8, 1)  # scrypt n, r, p of new password hashes
+PASSWORD_WORKERS = 2  # password hashes computed at the same time
+PASSWORD_QUEUE_LIMIT = 16  # logins hashing or waiting; more are refused at once
 
 
 def hash_password(password):
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Salted scrypt hash: ``scrypt$n$r$p$salt$hash`` (base64 salt and hash)"""
+    n, r, p = PASSWORD_SCRYPT
+    salt = os.urandom(16)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=32)
+    return '$'.join(['scrypt', str(n), str(r), str(p),
+                     base64.b64encode(salt).decode('ascii'), base64.b64encode(key).decode('ascii')])
+
+
+def verify_password(password, stored):
+    """Check a password against a scrypt hash or a legacy unsalted SHA-256 hex digest.
+
+    A malformed stored hash never matches.
+    """
+    if not isinstance(stored, str):
+        return False
+    try:
+        if stored.startswith('scrypt$'):
+            _, n, r, p, salt, key = stored.split('$')
+            candidate = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt, validate=True),
+                                       n=int(n), r=int(r), p=int(p), dklen=32)
+            return hmac.compare_digest(candidate, base64.b64decode(key, validate=True))
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    except (ValueError, TypeError):
+        return False  # also binascii.Error and scrypt parameter errors
+
+
+def needs_rehash(stored):
+    """True for legacy hashes and scrypt hashes with outdated parameters"""
+    return not stored.startswith('scrypt${}${}${}$'.format(*PASSWORD_SCRYPT))
+
+
+class PasswordBusyError(Exception):
+    """Too many password checks are already queued"""
+
+
+class PasswordHasher:
+    """Runs password hashing on a small thread pool.
+
+    scrypt releases the GIL, so request threads keep serving pages while a
+    login burst is hashed; at most PASSWORD_QUEUE_LIMIT checks are admitted
+    at a time (hashing or queued for a worker) and any check beyond that
+    raises PasswordBusyError at once instead of holding a request thread.
+    """
+
+    def __init__(self, workers, limit):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password')
+        self.slots = threading.BoundedSemaphore(limit)
 
+    def run(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordBusyError()
+        try:
+            return self.executor.submit(function, *args).result()
+        finally:
+            self.slots.release()
+
+    def verify(self, password, stored):
+        return self.run(verify_password, password, stored)
+
+    def hash(self, password):
+        return self.run(hash_password, password)
+
+
+password_hasher = PasswordHasher(PASSWORD_WORKERS, PASSWORD_QUEUE_LIMIT)
+DUMMY_PASSWORD_HASH = hash_password(uuid.uuid4().hex)
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on ``path`` (no-op without fcntl)"""
+    with open(path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_json_atomic(path, data, indent=None):
+    """Write JSON to a temporary file and atomically replace ``path``"""
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
 
-def load_visits():
-    """Load visits data from file"""
+
+def load_visits_file():
+    """Load the visits summary file (archived counters)"""
     if STATS_FILE.exists():
         with open(STATS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
@@ -58,158 +234,497 @@ def save_visits(data):
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
-def record_visit():
-    """Record a new visit with auto-cleanup of old data"""
-    data = load_visits()
-    if 'visitor_id' not in session:
-        session['visitor_id'] = str(uuid.uuid4())
+class HyperLogLog:
+    """Mergeable cardinality sketch for unique visitor counts"""
 
-    now = datetime.now()
-    cutoff = now - timedelta(days=30)
-    new_visits = []
-    old_sessions = set()
-    old_count = 0
+    PRECISION = 10
+    SIZE = 1 << PRECISION
+
+    def __init__(self, registers=None):
+        self.registers = registers or bytearray(self.SIZE)
+
+    @classmethod
+    def load(cls, encoded):
+        if not encoded:
+            return cls()
+        return cls(bytearray(base64.b64decode(encoded)))
+
+    def dump(self):
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        h = int.from_bytes(digest, 'big')
+        index = h >> (64 - self.PRECISION)
+        rest = h & ((1 << (64 - self.PRECISION)) - 1)
+        rank = (64 - self.PRECISION) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
 
-    for visit in data['visits']:
+    def count(self):
+        m = self.SIZE
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return int(round(estimate))
+
+
+class VisitRollup:
+    """Per-hour/day/month/year visit counters with unique-visitor sketches.
+
+    The rollup lives in ``visits/rollup.json`` and is merged with every
+    flushed batch, so statistics never rescan raw visits. Only the buckets
+    needed for current-vs-previous comparisons are retained.
+    """
+
+    PERIODS = {'hour': 13, 'day': 10, 'month': 7, 'year': 4}  # ISO prefix length
+
+    def __init__(self, path, lock_file):
+        self.path = path
+        self.lock_file = lock_file
+
+    @staticmethod
+    def empty():
+        return {
+            'total': {'visits': 0, 'hll': '', 'base_unique': 0},
+            'buckets': {}
+        }
+
+    def load(self):
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    @classmethod
+    def add_visits(cls, rollup, visits):
+        """Fold visits into ``rollup`` in place"""
+        sketches = {}
+
+        def sketch(key, bucket):
+            if key not in sketches:
+                sketches[key] = HyperLogLog.load(bucket['hll'])
+            return sketches[key]
+
+        total = rollup['total']
+        for visit in visits:
+            timestamp = visit.get('timestamp', '')
+            session_id = visit.get('session_id', visit.get('ip', 'unknown'))
+            total['visits'] += 1
+            sketch(None, total).add(session_id)
+            for period_name, length in cls.PERIODS.items():
+                key = f'{period_name}:{timestamp[:length]}'
+                bucket = rollup['buckets'].setdefault(key, {'visits': 0, 'hll': ''})
+                bucket['visits'] += 1
+                sketch(key, bucket).add(session_id)
+
+        for key, hll in sketches.items():
+            bucket = total if key is None else rollup['buckets'][key]
+            bucket['hll'] = hll.dump()
+        return rollup
+
+    @staticmethod
+    def prune(rollup, now=None):
+        """Drop buckets older than the previous period of their kind"""
+        now = now or datetime.now()
+        oldest = {
+            'hour': (now - timedelta(hours=1)).isoformat()[:13],
+            'day': (now - timedelta(days=1)).isoformat()[:10],
+            'month': (now.replace(day=1) - timedelta(days=1)).isoformat()[:7],
+            'year': str(now.year - 1)
+        }
+        rollup['buckets'] = {
+            key: bucket for key, bucket in rollup['buckets'].items()
+            if key.split(':', 1)[1] >= oldest[key.split(':', 1)[0]]
+        }
+        return rollup
+
+    def commit(self, visits):
+        """Merge a flushed batch into the stored rollup"""
+        with file_lock(self.lock_file):
+            rollup = self.load() or self.empty()
+            self.prune(self.add_visits(rollup, visits))
+            write_json_atomic(self.path, rollup)
+
+    def rebuild(self, visits, archived):
+        """Create the rollup from existing visits and archived counters"""
+        with file_lock(self.lock_file):
+            if self.path.exists():
+                return
+            rollup = self.empty()
+            rollup['total']['visits'] = archived['total_old_visits']
+            rollup['total']['base_unique'] = archived['total_old_unique']
+            self.prune(self.add_visits(rollup, visits))
+            write_json_atomic(self.path, rollup)
+
+    def snapshot(self, pending=()):
+        """Stored rollup plus visits that are not flushed yet"""
+        rollup = self.load() or self.empty()
+        if pending:
+            self.add_visits(rollup, pending)
+        return rollup
+
+
+class VisitBuffer:
+    """Visits queued by page handlers and written by a background thread.
+
+    record() only puts a (timestamp, session id) tuple on a bounded queue;
+    the writer thread batches them and persists a batch through the
+    subclass's ``commit()`` when it is full or stale. When the queue is
+    full the visit is dropped (after waiting VISIT_QUEUE_TIMEOUT with the
+    'block' policy) and counted. flush() drains everything synchronously
+    and runs at exit. Subclasses roll old visits into archived counters in
+    ``compact()``.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=VISIT_QUEUE_SIZE)
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.last_compaction = 0.0
+        self.writer = None
+        self.writer_pid = None
+        self.recorded = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, session_id, now=None):
+        """Queue a visit for the background writer"""
+        now = now or datetime.now()
+        if self.writer_pid != os.getpid():
+            self.start_writer()
         try:
-            visit_time = datetime.fromisoformat(visit['timestamp'])
-            if visit_time < cutoff:
-                old_count += 1
-                old_sessions.add(visit.get('session_id'))
+            if VISIT_QUEUE_POLICY == 'block':
+                self.queue.put((now.isoformat(), session_id), timeout=VISIT_QUEUE_TIMEOUT)
             else:
-                new_visits.append(visit)
-        except:
-            continue
+                self.queue.put_nowait((now.isoformat(), session_id))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return
+        with self.lock:
+            self.recorded += 1
+
+    def start_writer(self):
+        """Start the writer thread of this process"""
+        with self.lock:
+            if self.writer_pid == os.getpid():
+                return
+            self.writer_pid = os.getpid()
+            self.writer = threading.Thread(target=self.run_writer, daemon=True)
+            self.writer.start()
+
+    def run_writer(self):
+        while True:
+            try:
+                self.take(self.queue.get(timeout=VISIT_FLUSH_INTERVAL))
+            except queue.Empty:
+                pass
+            with self.lock:
+                due = (len(self.buffer) + self.queue.qsize() >= VISIT_FLUSH_SIZE or
+                       time.monotonic() - self.last_flush >= VISIT_FLUSH_INTERVAL)
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"✗ Error writing visits: {e}")
+
+    @staticmethod
+    def visit(timestamp, session_id):
+        return {'timestamp': timestamp, 'session_id': session_id}
+
+    def take(self, item):
+        with self.lock:
+            self.buffer.append(self.visit(*item))
+
+    def flush(self):
+        """Write queued and buffered visits"""
+        while True:
+            try:
+                self.take(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        with self.flush_lock:
+            with self.lock:
+                batch, self.buffer = self.buffer, []
+                self.last_flush = time.monotonic()
+            if batch:
+                try:
+                    self.commit(batch)
+                except Exception:
+                    with self.lock:
+                        self.failed += len(batch)
+                    raise
+
+        if time.monotonic() - self.last_compaction >= VISIT_COMPACT_INTERVAL:
+            self.last_compaction = time.monotonic()
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def pending(self):
+        """Visits queued or buffered but not written yet"""
+        with self.queue.mutex:
+            queued = list(self.queue.queue)
+        with self.lock:
+            buffered = list(self.buffer)
+        return buffered + [self.visit(*item) for item in queued]
+
+    def stats(self):
+        """Queue metrics of this worker"""
+        with self.lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'queue_size': VISIT_QUEUE_SIZE,
+                'buffered': len(self.buffer),
+                'policy': VISIT_QUEUE_POLICY,
+                'recorded': self.recorded,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'writer_alive': bool(self.writer and self.writer.is_alive()
+                                     and self.writer_pid == os.getpid())
+            }
 
-    if old_count > 0:
-        data['archived']['total_old_visits'] += old_count
-        data['archived']['total_old_unique'] += len(old_sessions)
 
-    data['visits'] = new_visits
-    visit = {
-        'timestamp': now.isoformat(),
-        'session_id': session['visitor_id']
-    }
-    data['visits'].append(visit)
-    save_visits(data)
+class VisitStore(VisitBuffer):
+    """Append-only visit log.
 
+    Visits are buffered in memory and appended in batches to daily segment
+    files (``visits/YYYY-MM-DD.log``, one JSON object per line). Segments
+    that fall out of the retention window are rolled into the archived
+    counters of ``visits.json`` by a background compaction, so recording a
+    visit never touches the existing history.
+    """
 
-def get_statistics():
-    """Calculate visit statistics"""
+    def __init__(self, segments_dir):
+        super().__init__()
+        self.segments_dir = segments_dir
+        self.lock_file = segments_dir / '.lock'
+        self.rollup = VisitRollup(segments_dir / 'rollup.json', self.lock_file)
+        self.segments_dir.mkdir(exist_ok=True)
+        self.migrate_legacy_visits()
+        if not self.rollup.path.exists():
+            self.rollup.rebuild(self.iter_visits(), load_visits_file()['archived'])
+
+    def segment_path(self, day):
+        return self.segments_dir / f'{day}.log'
+
+    def commit(self, visits):
+        self.append_visits(visits)
+        self.rollup.commit(visits)
+
+    def append_visits(self, visits):
+        """Write visits to the segment of their day in a single append"""
+        segments = {}
+        for visit in visits:
+            line = json.dumps(visit, ensure_ascii=False) + '\n'
+            segments.setdefault(visit['timestamp'][:10], []).append(line)
+        for day, lines in segments.items():
+            with open(self.segment_path(day), 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+
+    def iter_visits(self):
+        """Yield logged visits (oldest segment first), then buffered ones"""
+        for segment in sorted(self.segments_dir.glob('*.log')):
+            try:
+                with open(segment, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except FileNotFoundError:
+                continue  # compacted meanwhile
+        yield from self.pending()
+
+    def compact(self):
+        """Roll segments older than the retention window into archived counters"""
+        cutoff_day = (datetime.now() - timedelta(days=VISIT_RETENTION_DAYS)).date().isoformat()
+        old_count = 0
+        old_sessions = set()
+        claimed = []
+
+        for segment in sorted(self.segments_dir.glob('*.log')):
+            if segment.stem >= cutoff_day:
+                break
+            # Rename first so that only one worker compacts a segment
+            claimed_path = segment.with_suffix(f'.compact-{os.getpid()}')
+            try:
+                segment.rename(claimed_path)
+            except OSError:
+                continue
+            claimed.append(claimed_path)
+            with open(claimed_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        visit = json.loads(line)
+                    except ValueError:
+                        continue
+                    old_count += 1
+                    old_sessions.add(visit.get('session_id'))
+
+        if not claimed:
+            return
+
+        with file_lock(self.lock_file):
+            data = load_visits_file()
+            data['archived']['total_old_visits'] += old_count
+            data['archived']['total_old_unique'] += len(old_sessions)
+            save_visits(data)
+        for path in claimed:
+            path.unlink()
+
+    def migrate_legacy_visits(self):
+        """Move visits stored inline in visits.json into segments"""
+        with file_lock(self.lock_file):
+            data = load_visits_file()
+            if not data['visits']:
+                return
+            visits = [v for v in data['visits'] if 'timestamp' in v]
+            self.append_visits(visits)
+            data['visits'] = []
+            save_visits(data)
+        print(f"✓ Migrated {len(visits)} visits to {self.segments_dir}")
 
-    data = load_visits()
-    visits = data.get('visits', [])
 
-    now = datetime.now()
+def record_visit():
+    """Record a new visit"""
+    if 'visitor_id' not in session:
+        session['visitor_id'] = str(uuid.uuid4())
+    visit_store.record(session['visitor_id'])
 
-    archived = data.get('archived', {
-        'total_old_visits': 0,
-        'total_old_unique': 0
-    })
 
-    # Define time periods
+def get_statistics():
+    """Calculate visit statistics from the pre-aggregated rollup"""
+    now = datetime.now()
+    month_start = now.replace(day=1)
+
+    # Bucket keys of the current and the previous period
     periods = {
-        'hour': {
-            'current_start': now.replace(minute=0, second=0, microsecond=0),
-            'prev_start': now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1),
-            'prev_end': now.replace(minute=0, second=0, microsecond=0)
-        },
-        'day': {
-            'current_start': now.replace(hour=0, minute=0, second=0, microsecond=0),
-            'prev_start': now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1),
-            'prev_end': now.replace(hour=0, minute=0, second=0, microsecond=0)
-        },
-        'month': {
-            'current_start': now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
-            'prev_start': (now.replace(day=1) - timedelta(days=1)).replace(day=1, hour=0, minute=0, second=0,
-                                                                           microsecond=0),
-            'prev_end': now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        },
-        'year': {
-            'current_start': now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0),
-            'prev_start': now.replace(year=now.year - 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0),
-            'prev_end': now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        }
+        'hour': (now.isoformat()[:13], (now - timedelta(hours=1)).isoformat()[:13]),
+        'day': (now.isoformat()[:10], (now - timedelta(days=1)).isoformat()[:10]),
+        'month': (now.isoformat()[:7], (month_start - timedelta(days=1)).isoformat()[:7]),
+        'year': (str(now.year), str(now.year - 1))
     }
 
+    rollup = visit_store.rollup.snapshot(visit_store.pending())
+    total = rollup['total']
     stats = {
-        'total': {'visits': 0, 'unique': 0},
-        'hour': {'current': {'visits': 0, 'unique': 0}, 'previous': {'visits': 0, 'unique': 0}},
-        'day': {'current': {'visits': 0, 'unique': 0}, 'previous': {'visits': 0, 'unique': 0}},
-        'month': {'current': {'visits': 0, 'unique': 0}, 'previous': {'visits': 0, 'unique': 0}},
-        'year': {'current': {'visits': 0, 'unique': 0}, 'previous': {'visits': 0, 'unique': 0}}
+        'total': {
+            'visits': total['visits'],
+            'unique': HyperLogLog.load(total['hll']).count() + total['base_unique']
+        }
     }
 
-    # Session sets for unique counting
-    total_sessions = set()
-    period_sessions = {
-        'hour': {'current': set(), 'previous': set()},
-        'day': {'current': set(), 'previous': set()},
-        'month': {'current': set(), 'previous': set()},
-        'year': {'current': set(), 'previous': set()}
-    }
+    for period_name, (current_key, previous_key) in periods.items():
+        stats[period_name] = {}
+        for name, key in (('current', current_key), ('previous', previous_key)):
+            bucket = rollup['buckets'].get(f'{period_name}:{key}')
+            if bucket:
+                stats[period_name][name] = {
+                    'visits': bucket['visits'],
+                    'unique': HyperLogLog.load(bucket['hll']).count()
+                }
+            else:
+                stats[period_name][name] = {'visits': 0, 'unique': 0}
 
-    for visit in visits:
-        try:
-            visit_time = datetime.fromisoformat(visit['timestamp'])
-            session_id = visit.get('session_id', visit.get('ip', 'unknown'))
+    return stats
 
-            # Total
-            stats['total']['visits'] += 1
-            total_sessions.add(session_id)
-
-            # Check each period
-            for period_name, period_times in periods.items():
-                # Current period
-                if visit_time >= period_times['current_start']:
-                    stats[period_name]['current']['visits'] += 1
-                    period_sessions[period_name]['current'].add(session_id)
-
-                # Previous period
-                if period_times['prev_start'] <= visit_time < period_times['prev_end']:
-                    stats[period_name]['previous']['visits'] += 1
-                    period_sessions[period_name]['previous'].add(session_id)
-            stats['total']['visits'] += archived['total_old_visits']
-            stats['total']['unique'] += archived['total_old_unique']
-
-        except (ValueError, KeyError):
-            continue
 
-    # Calculate unique visits
-    stats['total']['unique'] = len(total_sessions)
-    for period_name in periods:
-        stats[period_name]['current']['unique'] = len(period_sessions[period_name]['current'])
-        stats[period_name]['previous']['unique'] = len(period_sessions[period_name]['previous'])
+class UserCache:
+    """Parsed accounts kept in memory while the store's signature is unchanged.
 
-    return stats
+    Subclasses provide ``load()`` (all users) and ``signature()`` (cheap
+    change marker); writes reset the cache.
+    """
+
+    def __init__(self):
+        self.users = None
+        self.users_signature = None
+        self.cache_lock = threading.Lock()
+
+    def cached(self):
+        signature = self.signature()
+        users = self.users
+        if users is None or signature != self.users_signature:
+            with self.cache_lock:
+                users = self.load()
+                self.users, self.users_signature = users, signature
+        return users
+
+    def get(self, username):
+        user = self.cached().get(username)
+        return None if user is None else dict(user)
+
+    def invalidate(self):
+        self.users = None
+
+
+class JsonUserStore(UserCache):
+    """Admin accounts in users.json"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.lock_file = path.with_name(path.name + '.lock')
+
+    def signature(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def load(self):
+        if not self.path.exists():
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, username, user):
+        with file_lock(self.lock_file):
+            users = self.load()
+            users[username] = user
+            write_json_atomic(self.path, users, indent=2)
+        self.invalidate()
+
+    def is_empty(self):
+        return not self.path.exists()
 
 
 def init_admin():
     """Initialize default admin account if not exists"""
-    users_file = DATA_DIR / 'users.json'
-    if not users_file.exists():
-        default_admin = {
-            'admin': {
-                'password': hash_password('admin123'),
-                'role': 'admin',
-                'created_at': datetime.now().isoformat()
-            }
-        }
-        with open(users_file, 'w', encoding='utf-8') as f:
-            json.dump(default_admin, f, ensure_ascii=False, indent=2)
+    if user_store.is_empty():
+        user_store.put('admin', {
+            'password': hash_password('admin123'),
+            'role': 'admin',
+            'created_at': datetime.now().isoformat()
+        })
         print("✓ Default admin account created (login: admin, password: admin123)")
     return True
 
 
 def check_credentials(username, password):
-    """Check if credentials are valid"""
-    users_file = DATA_DIR / 'users.json'
-    if users_file.exists():
-        with open(users_file, 'r', encoding='utf-8') as f:
-            users = json.load(f)
-        if username in users:
-            return users[username]['password'] == hash_password(password)
-    return False
+    """Check if credentials are valid, upgrading a legacy hash on success.
+
+    Raises PasswordBusyError when too many checks are already running.
+    """
+    user = user_store.get(username)
+    if user is None or password is None:
+        # Spend the same time as for a real account
+        password_hasher.verify(password or '', DUMMY_PASSWORD_HASH)
+        return False
+    if not password_hasher.verify(password, user['password']):
+        return False
+    if needs_rehash(user['password']):
+        user['password'] = password_hasher.hash(password)
+        user_store.put(username, user)
+    return True
 
 
 def login_required(f):
@@ -224,25 +739,164 @@ def login_required(f):
     return decorated_function
 
 
-# Initialize admin on startup
-init_admin()
+# Helper functions
+class FrozenDict(dict):
+    """Read-only dict used for shared configuration snapshots"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Config snapshot is read-only, use load_config() to modify it')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+
+def freeze(value):
+    """Recursively turn dicts and lists into FrozenDicts and tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable copy of a frozen value"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+class ConfigGeneration:
+    """Config generation counter shared by workers through a memory-mapped file.
+
+    Reading it is a plain memory access, so workers can check it on every
+    request without touching the file system.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with file_lock(path.with_name(path.name + '.lock')):
+            if not path.exists() or path.stat().st_size < 8:
+                with open(path, 'wb') as f:
+                    f.write(bytes(8))
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 8)
+
+    def read(self):
+        return int.from_bytes(self.map[:8], 'little')
+
+    def bump(self):
+        with file_lock(self.path.with_name(self.path.name + '.lock')):
+            self.map[:8] = (self.read() + 1).to_bytes(8, 'little')
+
+
+class JsonConfigSource:
+    """Configuration stored in config.json"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def signature(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def read(self):
+        """Stored configuration, None if there is none yet"""
+        if not self.path.exists():
+            return None
+        with open(self.path, 'rb') as f:
+            return json.loads(f.read())
+
+    def write(self, config):
+        """Replace the configuration, returns the new signature"""
+        write_json_atomic(self.path, config, indent=2)
+        return self.signature()
+
+
+class ConfigStore:
+    """In-memory snapshot of the stored configuration.
+
+    The configuration is parsed once and re-read only when the signature of
+    its source changes (config.json mtime/inode/size or the SQLite config
+    version, checked at most every CONFIG_CHECK_INTERVAL seconds) or when
+    save_config() writes it. With CONFIG_NOTIFY enabled, workers are told
+    about writes through a shared ConfigGeneration counter and the source is
+    only polled every CONFIG_NOTIFY_FALLBACK seconds to catch manual edits.
+    """
+
+    def __init__(self, source, generation_path):
+        self.source = source
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.signature = None
+        self.version = None
+        self.checked_at = 0.0
+        self.generation = ConfigGeneration(generation_path) if CONFIG_NOTIFY else None
+        self.seen_generation = self.generation.read() if self.generation else 0
+
+    def is_stale(self):
+        now = time.monotonic()
+        if self.generation:
+            generation = self.generation.read()
+            if generation != self.seen_generation:
+                self.seen_generation = generation
+                return True
+            interval = CONFIG_NOTIFY_FALLBACK
+        else:
+            interval = CONFIG_CHECK_INTERVAL
+        if now - self.checked_at < interval:
+            return False
+        self.checked_at = now
+        return self.source.signature() != self.signature
+
+    def get(self):
+        """Current read-only configuration"""
+        if self.snapshot is None or self.is_stale():
+            with self.lock:
+                self.reload()
+        return self.snapshot
+
+    def reload(self):
+        signature = self.source.signature()
+        config = self.source.read()
+        if config is None:
+            self.set(get_default_config(), None)
+            return
+        self.set(config, signature)
+
+    def set(self, config, signature):
+        self.snapshot = freeze(config)
+        self.signature = signature
+        self.version = hashlib.sha1(
+            json.dumps(config, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()[:16]
+
+    def save(self, config):
+        with self.lock:
+            self.set(config, self.source.write(config))
+        if self.generation:
+            self.generation.bump()
+            self.seen_generation = self.generation.read()
+
+
+def config_snapshot():
+    """Read-only configuration shared between requests"""
+    return config_store.get()
 
 
-# Helper functions
 def load_config():
-    """Load configuration from file"""
-    config_file = DATA_DIR / 'config.json'
-    if config_file.exists():
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return get_default_config()
+    """Load a mutable copy of the configuration"""
+    return thaw(config_store.get())
 
 
 def save_config(config):
     """Save configuration to file"""
-    config_file = DATA_DIR / 'config.json'
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    config_store.save(config)
+    page_cache.invalidate()
 
 
 def get_default_config():
@@ -270,42 +924,1254 @@ def get_default_config():
     }
 
 
+class PostStore:
+    """Posts kept in an append-only NDJSON log with an id → offset index.
+
+    Every create/update appends the full post as one line (the write is the
+    commit: it is flushed and fsynced before the index changes) and a delete
+    appends a tombstone. Reads seek straight to the latest record of a post,
+    so single-post reads and edits stay constant-time as the archive grows.
+    Records appended by other workers are picked up by scanning only the new
+    tail of the log; the log is rewritten when dead records dominate it.
+    """
+
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self, path, legacy_path):
+        self.path = path
+        self.lock_file = path.with_name(path.name + '.lock')
+        self.lock = threading.Lock()
+        self.index = {}  # id -> (offset, length)
+        self.size = 0
+        self.inode = None
+        self.dead_bytes = 0
+        if not path.exists():
+            self.migrate_legacy(legacy_path)
+        self.refresh()
+
+    def refresh(self):
+        """Index records appended since the last scan (or rescan if rewritten)"""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return
+        with self.lock:
+            if st.st_ino != self.inode or st.st_size < self.size:
+                self.index, self.size, self.dead_bytes = {}, 0, 0
+                self.inode = st.st_ino
+            if st.st_size == self.size:
+                return
+            with open(self.path, 'rb') as f:
+                f.seek(self.size)
+                offset = self.size
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # incomplete write, not committed
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if isinstance(record, dict) and 'id' in record:
+                        self.apply(record, offset, len(line))
+                    else:
+                        self.dead_bytes += len(line)  # damaged line, dropped by compact()
+                    offset += len(line)
+                self.size = offset
+
+    def apply(self, record, offset, length):
+        deleted = record.get('deleted')
+        previous = self.index.pop(record['id'], None) if deleted else self.index.get(record['id'])
+        if previous:
+            self.dead_bytes += previous[1]
+        if deleted:
+            self.dead_bytes += length
+        else:
+            self.index[record['id']] = (offset, length)
+
+    def append(self, records):
+        """Durably append records, then index them"""
+        with file_lock(self.lock_file):
+            self.append_locked(records)
+
+    def append_locked(self, records):
+        data = b''.join(json.dumps(r, ensure_ascii=False).encode('utf-8') + b'\n' for r in records)
+        self.refresh()
+        with open(self.path, 'ab') as f:
+            if f.seek(0, os.SEEK_END) != self.size:
+                f.truncate(self.size)  # drop a torn record left by a crash
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.refresh()
+        if self.dead_bytes > max(self.size // 2, self.COMPACT_MIN_BYTES):
+            self.compact()
+
+    def open_indexed(self):
+        """Refresh the index and open the log, returns (file, its inode).
+
+        Another worker's compact() may replace the log between refresh()
+        and open(); offsets in ``self.index`` belong to the open file only
+        while its inode equals ``self.inode`` (compare under ``self.lock``).
+        """
+        self.refresh()
+        f = open(self.path, 'rb')
+        return f, os.fstat(f.fileno()).st_ino
+
+    def get(self, post_id):
+        for _ in range(2):
+            f, inode = self.open_indexed()
+            with f:
+                with self.lock:
+                    current = inode == self.inode
+                    location = self.index.get(post_id)
+                if not current:
+                    continue  # rewritten meanwhile: rescan and retry
+                if location is None:
+                    return None
+                f.seek(location[0])
+                try:
+                    record = json.loads(f.read(location[1]))
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get('id') == post_id:
+                    return record
+        return None
+
+    def put(self, post):
+        self.append([post])
+
+    def delete(self, post_id):
+        self.append([{'id': post_id, 'deleted': True}])
+
+    def new_id(self):
+        """Millisecond timestamp id, bumped if already taken"""
+        self.refresh()
+        post_id = int(datetime.now().timestamp() * 1000)
+        while post_id in self.index:
+            post_id += 1
+        return post_id
+
+    def has(self, post_id):
+        self.refresh()
+        return post_id in self.index
+
+    def version(self):
+        self.refresh()
+        return self.inode, self.size
+
+    def last_modified(self):
+        return file_version(self.path)[1]
+
+    def iter_records(self):
+        """Raw JSON lines of the live posts, in creation order"""
+        for _ in range(2):
+            f, inode = self.open_indexed()
+            with self.lock:
+                current = inode == self.inode
+                locations = list(self.index.values())
+            if current:
+                break
+            f.close()
+        with f:
+            for offset, length in locations:
+                f.seek(offset)
+                yield f.read(length)
+
+    def all_posts(self):
+        return [json.loads(line) for line in self.iter_records()]
+
+    def export_lines(self):
+        yield from self.iter_records()
+
+    def import_lines(self, stream):
+        return import_post_lines(self, stream)
+
+    def compact(self):
+        """Rewrite the log with live records only (caller holds the file lock)"""
+        tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as out:
+            for line in self.iter_records():
+                out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.path)
+        self.refresh()
+
+    def migrate_legacy(self, legacy_path):
+        """Import posts.json into the log on first start"""
+        if not legacy_path.exists():
+            return
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            posts = json.load(f)
+        with file_lock(self.lock_file):
+            if self.path.exists():
+                return
+            self.append_locked(posts)
+        print(f"✓ Migrated {len(posts)} posts to {self.path}")
+
+
+def import_post_lines(store, stream):
+    """Append posts from an NDJSON stream to ``store`` in batches, returns the count"""
+    batch = []
+    count = 0
+    next_id = store.new_id()
+    for line in stream:
+        if not line.strip():
+            continue
+        post = json.loads(line)
+        if not isinstance(post, dict):
+            raise ValueError('each line must be a JSON object')
+        if 'id' not in post:
+            while store.has(next_id):
+                next_id += 1
+            post['id'] = next_id
+            next_id += 1
+        post.setdefault('created_at', datetime.now().isoformat())
+        post.setdefault('updated_at', post['created_at'])
+        post.pop('deleted', None)
+        batch.append(post)
+        if len(batch) >= POSTS_IMPORT_BATCH:
+            store.append(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        store.append(batch)
+        count += len(batch)
+    return count
+
+
+# SQLite storage backend
+class SqliteDatabase:
+    """SQLite database in WAL mode shared by the SQLite stores.
+
+    Each thread of each worker process keeps its own connection (reopened
+    after a fork), and every statement is a constant SQL string, so the
+    connection's statement cache serves them as prepared statements.
+    Writers take the database lock up front with BEGIN IMMEDIATE; readers
+    never block them thanks to WAL.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)',
+        'CREATE TABLE IF NOT EXISTS visits ('
+        'id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, session_id TEXT)',
+        'CREATE INDEX IF NOT EXISTS visits_timestamp ON visits (timestamp)',
+        'CREATE INDEX IF NOT EXISTS visits_session ON visits (session_id)',
+        'CREATE TABLE IF NOT EXISTS visit_rollup ('
+        'key TEXT PRIMARY KEY, visits INTEGER NOT NULL, hll TEXT NOT NULL, '
+        'base_unique INTEGER NOT NULL DEFAULT 0)',
+        'CREATE TABLE IF NOT EXISTS posts (id INTEGER PRIMARY KEY, data TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, data TEXT NOT NULL)',
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.transaction() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def connection(self):
+        """Connection of the current thread in this process"""
+        local = self.local
+        if getattr(local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None,
+                                   cached_statements=SQLITE_STATEMENT_CACHE)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}')
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def get_meta(self, key, default=None):
+        row = self.connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    @staticmethod
+    def set_meta(conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @staticmethod
+    def increment_meta(conn, key, amount=1):
+        conn.execute('INSERT INTO meta (key, value) VALUES (?, ?) '
+                     'ON CONFLICT (key) DO UPDATE SET value = value + excluded.value',
+                     (key, amount))
+
+
+class SqliteVisitRollup:
+    """VisitRollup buckets kept in the visit_rollup table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def load(self, conn=None):
+        rollup = VisitRollup.empty()
+        rows = (conn or self.db.connection()).execute(
+            'SELECT key, visits, hll, base_unique FROM visit_rollup')
+        for key, visits, hll, base_unique in rows:
+            if key == 'total':
+                rollup['total'] = {'visits': visits, 'hll': hll, 'base_unique': base_unique}
+            else:
+                rollup['buckets'][key] = {'visits': visits, 'hll': hll}
+        return rollup
+
+    @staticmethod
+    def save(conn, rollup):
+        total = rollup['total']
+        rows = [('total', total['visits'], total['hll'], total['base_unique'])]
+        rows += [(key, bucket['visits'], bucket['hll'], 0)
+                 for key, bucket in rollup['buckets'].items()]
+        conn.execute('DELETE FROM visit_rollup')
+        conn.executemany('INSERT INTO visit_rollup (key, visits, hll, base_unique) '
+                         'VALUES (?, ?, ?, ?)', rows)
+
+    def commit(self, conn, visits):
+        """Merge a flushed batch inside the caller's transaction"""
+        rollup = VisitRollup.add_visits(self.load(conn), visits)
+        self.save(conn, VisitRollup.prune(rollup))
+
+    def snapshot(self, pending=()):
+        rollup = self.load()
+        if pending:
+            VisitRollup.add_visits(rollup, pending)
+        return rollup
+
+
+class SqliteVisitStore(VisitBuffer):
+    """Visits in the visits table, batched like VisitStore.
+
+    A flushed batch and its rollup update are one transaction; compaction
+    deletes visits older than the retention window through the timestamp
+    index and adds them to the archived counters in meta.
+    """
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.rollup = SqliteVisitRollup(db)
+
+    def commit(self, visits):
+        with self.db.transaction() as conn:
+            self.insert(conn, visits)
+            self.rollup.commit(conn, visits)
+
+    @staticmethod
+    def insert(conn, visits):
+        conn.executemany('INSERT INTO visits (timestamp, session_id) VALUES (?, ?)',
+                         [(v['timestamp'], v.get('session_id', v.get('ip'))) for v in visits])
+
+    def iter_visits(self):
+        rows = self.db.connection().execute(
+            'SELECT timestamp, session_id FROM visits ORDER BY timestamp')
+        for timestamp, session_id in rows:
+            yield {'timestamp': timestamp, 'session_id': session_id}
+        yield from self.pending()
+
+    def compact(self):
+        cutoff_day = (datetime.now() - timedelta(days=VISIT_RETENTION_DAYS)).date().isoformat()
+        with self.db.transaction() as conn:
+            old_count, old_unique = conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT session_id) FROM visits WHERE timestamp < ?',
+                (cutoff_day,)).fetchone()
+            if not old_count:
+                return
+            conn.execute('DELETE FROM visits WHERE timestamp < ?', (cutoff_day,))
+            self.db.increment_meta(conn, 'total_old_visits', old_count)
+            self.db.increment_meta(conn, 'total_old_unique', old_unique)
+
+
+class SqlitePostStore:
+    """Posts in the posts table, indexed by their id primary key"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, post_id):
+        row = self.db.connection().execute(
+            'SELECT data FROM posts WHERE id = ?', (post_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def has(self, post_id):
+        return self.db.connection().execute(
+            'SELECT 1 FROM posts WHERE id = ?', (post_id,)).fetchone() is not None
+
+    def append(self, posts):
+        with self.db.transaction() as conn:
+            conn.executemany('INSERT OR REPLACE INTO posts (id, data) VALUES (?, ?)',
+                             [(p['id'], json.dumps(p, ensure_ascii=False)) for p in posts])
+            self.touch(conn)
+
+    def put(self, post):
+        self.append([post])
+
+    def delete(self, post_id):
+        with self.db.transaction() as conn:
+            conn.execute('DELETE FROM posts WHERE id = ?', (post_id,))
+            self.touch(conn)
+
+    def touch(self, conn):
+        self.db.increment_meta(conn, 'posts_version')
+        self.db.set_meta(conn, 'posts_modified', time.time())
+
+    def new_id(self):
+        """Millisecond timestamp id, bumped if already taken"""
+        post_id = int(datetime.now().timestamp() * 1000)
+        while self.has(post_id):
+            post_id += 1
+        return post_id
+
+    def version(self):
+        return self.db.get_meta('posts_version', 0)
+
+    def last_modified(self):
+        modified = self.db.get_meta('posts_modified')
+        return None if modified is None else datetime.fromtimestamp(modified, timezone.utc)
+
+    def iter_records(self):
+        """JSON lines of the posts, in creation order"""
+        for (data,) in self.db.connection().execute('SELECT data FROM posts ORDER BY id'):
+            yield data.encode('utf-8') + b'\n'
+
+    def all_posts(self):
+        return [json.loads(data) for (data,) in
+                self.db.connection().execute('SELECT data FROM posts ORDER BY id')]
+
+    def export_lines(self):
+        yield from self.iter_records()
+
+    def import_lines(self, stream):
+        return import_post_lines(self, stream)
+
+
+class SqliteUserStore(UserCache):
+    """Admin accounts in the users table, versioned by users_version in meta"""
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+
+    def signature(self):
+        return self.db.get_meta('users_version', 0)
+
+    def load(self):
+        rows = self.db.connection().execute('SELECT username, data FROM users')
+        return {username: json.loads(data) for username, data in rows}
+
+    def put(self, username, user):
+        with self.db.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO users (username, data) VALUES (?, ?)',
+                         (username, json.dumps(user, ensure_ascii=False)))
+            self.db.increment_meta(conn, 'users_version')
+        self.invalidate()
+
+    def is_empty(self):
+        return self.db.connection().execute('SELECT 1 FROM users LIMIT 1').fetchone() is None
+
+
+class SqliteConfigSource:
+    """Configuration stored as JSON in meta, versioned by a write counter"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def signature(self):
+        return self.db.get_meta('config_version')
+
+    def read(self):
+        config = self.db.get_meta('config')
+        return None if config is None else json.loads(config)
+
+    def write(self, config):
+        with self.db.transaction() as conn:
+            self.db.set_meta(conn, 'config', json.dumps(config, ensure_ascii=False))
+            self.db.increment_meta(conn, 'config_version')
+        return self.signature()
+
+
+Storage = namedtuple('Storage', 'visits posts users config')
+
+
+def open_storage(backend):
+    """Visit, post, user and config stores of a storage backend"""
+    if backend == 'json':
+        return Storage(VisitStore(VISITS_DIR), PostStore(POSTS_LOG, POSTS_FILE),
+                       JsonUserStore(USERS_FILE), JsonConfigSource(CONFIG_FILE))
+    if backend == 'sqlite':
+        db = SqliteDatabase(SQLITE_FILE)
+        return Storage(SqliteVisitStore(db), SqlitePostStore(db),
+                       SqliteUserStore(db), SqliteConfigSource(db))
+    raise ValueError(f'Unknown storage backend: {backend}')
+
+
+# Opened by open_data() on startup, not on import: importing the module
+# (CLI, tests, benchmarks) must not migrate or create anything in DATA_DIR
+storage = None
+visit_store = None
+post_store = None
+user_store = None
+config_store = None
+
+
+def open_data():
+    """Open the configured storage backend and bind the module-level stores"""
+    global storage, visit_store, post_store, user_store, config_store
+    storage = open_storage(STORAGE_BACKEND)
+    visit_store = storage.visits
+    post_store = storage.posts
+    user_store = storage.users
+    config_store = ConfigStore(storage.config, DATA_DIR / '.config.gen')
+    atexit.register(visit_store.flush)
+
+
+@app.cli.command('migrate-storage')
+def migrate_storage():
+    """Copy the JSON data files into the SQLite database (one-shot)"""
+    source = open_storage('json')
+    target = open_storage('sqlite')
+    db = target.posts.db
+    if db.get_meta('migrated_at'):
+        print(f"✗ {SQLITE_FILE} was already migrated at {db.get_meta('migrated_at')}")
+        return
+
+    config = source.config.read()
+    if config is not None:
+        target.config.write(config)
+    users = source.users.load()
+    for username, user in users.items():
+        target.users.put(username, user)
+    posts = import_post_lines(target.posts, source.posts.export_lines())
+
+    visits = list(source.visits.iter_visits())
+    archived = load_visits_file()['archived']
+    with db.transaction() as conn:
+        target.visits.insert(conn, visits)
+        target.visits.rollup.save(conn, source.visits.rollup.load() or VisitRollup.empty())
+        db.set_meta(conn, 'total_old_visits', archived['total_old_visits'])
+        db.set_meta(conn, 'total_old_unique', archived['total_old_unique'])
+        db.set_meta(conn, 'migrated_at', datetime.now().isoformat())
+    print(f"✓ Migrated {len(users)} users, {posts} posts and {len(visits)} visits to {SQLITE_FILE}")
+
+
+class JsonPayload:
+    """Pre-serialized JSON body with its strong ETag"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, data, etag_prefix=None):
+        if isinstance(data, bytes):
+            self.body = data  # already serialized
+        else:
+            self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        if etag_prefix:
+            self.etag = f'{etag_prefix}-{self.etag[:16]}'
+
+
+def json_payload_response(payload, status=200, cache_control=None, last_modified=None):
+    """Serve a JsonPayload, answering conditional requests with 304"""
+    response = app.response_class(payload.body, status=status, mimetype='application/json')
+    response.set_etag(payload.etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+
+class ResponseCache:
+    """JsonPayloads cached per key and data version.
+
+    The payload (body bytes and ETag) is rebuilt only when the version
+    passed by the caller changes, so repeated requests neither call the
+    data source nor serialize anything.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key, version, build):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            entry = (version, JsonPayload(build()))
+            self.entries[key] = entry
+        return entry[1]
+
+    def invalidate(self, key):
+        self.entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix):
+        """Drop ``prefix`` and its ``prefix:...`` sub-keys"""
+        for key in [k for k in list(self.entries) if k == prefix or k.startswith(prefix + ':')]:
+            self.entries.pop(key, None)
+
+
+response_cache = ResponseCache()
+
+
+def cached_json_response(key, version, build, cache_control, last_modified=None):
+    """Serve ``build()`` as JSON, serialized once per ``version``"""
+    payload = response_cache.get(key, version, build)
+    return json_payload_response(payload, cache_control=cache_control,
+                                 last_modified=last_modified)
+
+
+class PageCache:
+    """Rendered HTML pages keyed by route and the versions they depend on.
+
+    An entry is reused while the caller's version (config version, post
+    updated_at, ...) and the mtimes of the template and of the templates it
+    extends or includes are unchanged, so repeat views skip Jinja entirely.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> (version, body, etag)
+        self.templates = {}  # template name -> (files, mtimes)
+        self.lock = threading.Lock()
+
+    def template_files(self, name, seen=None):
+        """Template file followed by the files it references"""
+        seen = seen if seen is not None else set()
+        seen.add(name)
+        env = app.jinja_env
+        source, filename, _ = env.loader.get_source(env, name)
+        files = [filename]
+        for reference in jinja_meta.find_referenced_templates(env.parse(source)):
+            if reference and reference not in seen:
+                files += self.template_files(reference, seen)
+        return files
+
+    @staticmethod
+    def file_mtimes(files):
+        mtimes = []
+        for path in files:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def template_version(self, name):
+        entry = self.templates.get(name)
+        if entry is not None:
+            files, mtimes = entry
+            if self.file_mtimes(files) == mtimes:
+                return mtimes
+        files = self.template_files(name)
+        if ASSET_BUNDLES:
+            files.append(ASSETS_MANIFEST)  # bundles rebuilt
+        mtimes = self.file_mtimes(files)
+        self.templates[name] = (files, mtimes)
+        return mtimes
+
+    def render(self, key, version, template, **context):
+        """Body and ETag of a page, rendered only when a dependency changed"""
+        version = (version, self.template_version(template))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        body = render_template(template, **context).encode('utf-8')
+        etag = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            self.entries[key] = (version, body, etag)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return body, etag
+
+    def invalidate(self, key=None):
+        """Drop one page, or all pages"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+
+page_cache = PageCache(PAGE_CACHE_SIZE)
+
+
+def cached_page_response(key, version, template, **context):
+    """Serve a page from page_cache, answering conditional requests with 304"""
+    body, etag = page_cache.render(key, version, template, **context)
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL_REVALIDATE
+    return response.make_conditional(request)
+
+
+# Response compression
+def _zstd_compress(data, level):
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# encoding -> (compress(data, level), level for cached bodies, level for one-off bodies)
+COMPRESSORS = OrderedDict()
+if brotli is not None:
+    COMPRESSORS['br'] = (lambda data, level: brotli.compress(data, quality=level), 11, 4)
+if zstandard is not None:
+    COMPRESSORS['zstd'] = (_zstd_compress, 19, 3)
+COMPRESSORS['gzip'] = (lambda data, level: gzip.compress(data, level, mtime=0), 9, 6)
+
+
+class CompressionCache:
+    """Compressed bodies keyed by (ETag, encoding).
+
+    Responses with a strong ETag carry identical bytes every time, so each
+    encoding is computed once (at the highest level) and reused.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_compress(self, etag, encoding, data):
+        key = (etag, encoding)
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+                return body
+        compress, level, _ = COMPRESSORS[encoding]
+        body = compress(data, level)
+        with self.lock:
+            self.entries[key] = body
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return body
+
+
+compression_cache = CompressionCache(COMPRESS_CACHE_SIZE)
+
+
+def is_compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESS_MIMETYPES
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large text responses with the best encoding the client accepts"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed or
+            'Content-Encoding' in response.headers or not is_compressible(response)):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = next((name for name in COMPRESSORS if request.accept_encodings[name]), None)
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        body = compression_cache.get_or_compress(etag, encoding, data)
+        response.set_etag(etag, weak=True)  # same entity, different bytes
+    else:
+        compress, _, level = COMPRESSORS[encoding]
+        body = compress(data, level)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class ResultCache:
+    """Size-bounded LRU cache with TTL for plugin computation results"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        result = compute()
+        with self.lock:
+            self.entries[key] = (now + self.ttl, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return result
+
+    def invalidate(self, plugin=None):
+        """Drop cached results of one plugin, or everything"""
+        with self.lock:
+            if plugin is None:
+                self.entries.clear()
+            else:
+                for key in [k for k in self.entries if k[0] == plugin]:
+                    del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+EQUATION_ARROWS = re.compile(r'\s*(?:=|→|->|⟶|⇄|⇌)\s*')
+COMPOUND_SEPARATOR = re.compile(r'\s*\+(?=\s*[A-Z(\[\d])\s*')  # not the '+' of an ion charge
+
+
+def normalize_equation(equation, sort_compounds=True):
+    """Canonical equation text: no inner spaces, '=' as arrow, sorted compounds"""
+    sides = []
+    for side in EQUATION_ARROWS.split(equation.strip(), maxsplit=1):
+        compounds = [''.join(c.split()) for c in COMPOUND_SEPARATOR.split(side)]
+        compounds = [c for c in compounds if c]
+        if sort_compounds:
+            compounds.sort()
+        sides.append(' + '.join(compounds))
+    return ' = '.join(sides)
+
+
+def normalize_ordered_equation(equation):
+    """Canonical equation text keeping the compound order (it maps to coefficients)"""
+    return normalize_equation(equation, sort_compounds=False)
+
+
+def normalize_whitespace(value):
+    """Input stripped, with runs of inner whitespace collapsed to one space"""
+    return ' '.join(value.split())
+
+
+def normalize_formula(value):
+    """Formula with all whitespace removed (spaces carry no meaning in a formula)"""
+    return ''.join(value.split())
+
+
+def restore_input(result, canonical, value):
+    """Copy of ``result`` whose fields echoing the canonical input show the user's input"""
+    value = value.strip()
+    if not isinstance(result, dict) or value == canonical:
+        return result
+    return {key: value if item == canonical else item for key, item in result.items()}
+
+
+def compute_plugin_result(name, compute, value, normalize):
+    """Run a pure plugin computation on normalized input through result_cache.
+
+    The canonical text is only the cache key and the solver input; fields of
+    the result that echo it are given back the user's own spelling.
+    """
+    canonical = normalize(value)
+    key = (name, compute.__name__, canonical)  # plugin first: invalidate() matches k[0]
+    result = result_cache.get_or_compute(key, lambda: compute(canonical))
+    return restore_input(result, canonical, value)
+
+
+# Normalizers available to plugin handlers ('normalize' in PLUGIN_CONFIG)
+PLUGIN_NORMALIZERS = {
+    'equation': normalize_equation,
+    'ordered_equation': normalize_ordered_equation,
+    'whitespace': normalize_whitespace,
+    'formula': normalize_formula
+}
+
+
+def file_version(path):
+    """Change signature and modification time of a data file"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None, None
+    return (st.st_mtime_ns, st.st_ino, st.st_size), datetime.fromtimestamp(st.st_mtime, timezone.utc)
+
+
+class ElementRepository:
+    """Periodic table data loaded once, indexed and pre-serialized.
+
+    Lookups by symbol and atomic number and filters by category, period and
+    group are dictionary lookups returning ready JsonPayload bodies.
+    """
+
+    INDEXED_FIELDS = ('category', 'period', 'group')
+
+    def __init__(self, elements):
+        self.elements = [{'symbol': sym, **data} for sym, data in elements.items()]
+        self.all = JsonPayload(self.elements)
+        self.empty = JsonPayload([])
+        self.by_symbol = {sym.upper(): JsonPayload(data) for sym, data in elements.items()}
+        self.last_modified = None
+        self.by_number = {data['number']: self.by_symbol[sym.upper()]
+                          for sym, data in elements.items()}
+
+        self.indexes = {}
+        for field in self.INDEXED_FIELDS:
+            groups = {}
+            for element in self.elements:
+                groups.setdefault(element.get(field), []).append(element)
+            self.indexes[field] = {value: JsonPayload(items) for value, items in groups.items()}
+
+    @classmethod
+    def load(cls, path):
+        """Build the repository from elements.json, None if it is missing"""
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            repository = cls(json.load(f))
+        repository.last_modified = file_version(path)[1]
+        return repository
+
+    def filtered(self, field, value):
+        return self.indexes[field].get(value, self.empty)
+
+
+element_repository = ElementRepository.load(DATA_DIR / 'elements.json')
+ELEMENTS_CACHING = {
+    'cache_control': CACHE_CONTROL_STATIC,
+    'last_modified': element_repository.last_modified if element_repository else None
+}
+
+
 # Initialize plugin system
+class PluginHandler:
+    """Endpoint declared in PLUGIN_CONFIG['handlers'], bound to its module.
+
+    Handler spec keys:
+        method     'GET' (query arguments) or 'POST' (JSON body), default GET
+        params     required non-empty inputs, passed positionally as strings
+        optional   {input: default}, passed after params, coerced to the default's type
+        match      {input: value} that must be present as given
+        handler    name of the module function to call
+        normalize  PLUGIN_NORMALIZERS key applied to the first param
+        cacheable  memoize results in result_cache (single-param handlers)
+        batch      field name of the list of inputs for /api/plugin/<name>/batch
+        response   'json' (jsonify the result, default) or 'payload' (the
+                   function returns serialized JSON, cached per plugin version)
+        not_found  error message returned with 404 when the result is None
+    """
+
+    def __init__(self, plugin, module, spec):
+        self.plugin = plugin
+        self.method = spec.get('method', 'GET').upper()
+        self.params = tuple(spec.get('params', ()))
+        self.optional = dict(spec.get('optional', {}))
+        self.match = dict(spec.get('match', {}))
+        self.function = getattr(module, spec['handler'], None)
+        if not callable(self.function):
+            raise ValueError(f"handler {spec['handler']!r} is not a function of the plugin")
+        normalize = spec.get('normalize')
+        if normalize is not None and normalize not in PLUGIN_NORMALIZERS:
+            raise ValueError(f'unknown normalizer {normalize!r}')
+        self.normalize = PLUGIN_NORMALIZERS.get(normalize)
+        self.cacheable = spec.get('cacheable', False) and len(self.params) == 1 and not self.optional
+        self.batch = spec.get('batch') if len(self.params) == 1 else None
+        self.response = spec.get('response', 'json')
+        self.not_found = spec.get('not_found')
+        self.version = (module.PLUGIN_CONFIG.get('version'), id(module))
+
+    def matches(self, args):
+        return (all(args.get(key) == value for key, value in self.match.items()) and
+                all(args.get(param) for param in self.params))
+
+    def compute(self, value, *extra):
+        """Result for the first param (normalized, memoized if cacheable)"""
+        if self.cacheable:
+            return compute_plugin_result(self.plugin, self.function, value,
+                                         self.normalize or str)
+        if self.normalize:
+            canonical = self.normalize(value)
+            return restore_input(self.function(canonical, *extra), canonical, value)
+        return self.function(value, *extra)
+
+    def call(self, args):
+        values = [str(args[param]) for param in self.params]
+        for key, default in self.optional.items():
+            try:
+                values.append(type(default)(args.get(key, default)))
+            except (TypeError, ValueError):
+                values.append(default)
+        if not values:
+            return self.function()
+        return self.compute(*values)
+
+    def respond(self, args):
+        if self.response == 'payload':
+            return cached_json_response(f'plugin:{self.plugin}:{self.function.__name__}',
+                                        self.version, self.function, CACHE_CONTROL_PLUGIN)
+        result = self.call(args)
+        if result is None and self.not_found:
+            return jsonify({'error': self.not_found}), 404
+        return jsonify(result)
+
+
+def read_plugin_manifest(init_file):
+    """PLUGIN_CONFIG literal of a plugin module, read without executing it.
+
+    Returns None when the module has no literal PLUGIN_CONFIG assignment.
+    """
+    tree = ast.parse(init_file.read_bytes(), filename=str(init_file))
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and
+                any(isinstance(t, ast.Name) and t.id == 'PLUGIN_CONFIG' for t in node.targets)):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                return None
+    return None
+
+
 class PluginManager:
+    """Plugins discovered from their manifests and imported on first use.
+
+    Startup only parses PLUGIN_CONFIG out of every ``plugins/*/__init__.py``;
+    a module is executed the first time get_plugin() asks for it (or at
+    startup when listed in PLUGIN_WARMUP). Loaded modules are registered in
+    sys.modules, so a plugin imported by another one is shared, not rebuilt.
+    """
+
     def __init__(self):
+        self.manifests = {}
         self.plugins = {}
-        self.config_file = DATA_DIR / 'config.json'
-        self.load_plugins()
+        self.handlers = {}  # (name, method) -> PluginHandlers in declaration order
+        self.batch_handlers = {}  # name -> PluginHandler
+        self.contents = {}  # name -> JsonPayload of get_content()
+        self.signatures = {}
+        self.lock = threading.RLock()
+        self.config_file = CONFIG_FILE
+        self.watcher = None
 
     def load_plugins(self):
-        """Load all plugins from plugins directory"""
-        for plugin_dir in PLUGINS_DIR.glob('*/'):
-            if plugin_dir.is_dir() and (plugin_dir / '__init__.py').exists():
-                plugin_name = plugin_dir.name
-                try:
-                    import importlib.util
-                    spec = importlib.util.spec_from_file_location(
-                        f"plugins.{plugin_name}",
-                        plugin_dir / '__init__.py'
-                    )
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-
-                    if hasattr(module, 'PLUGIN_CONFIG'):
-                        self.plugins[plugin_name] = module
-                        print(f"✓ Plugin loaded: {plugin_name}")
-                except Exception as e:
-                    print(f"✗ Error loading plugin {plugin_name}: {e}")
-        
+        """Read plugin manifests from plugins directory"""
+        for plugin_name in self.plugin_names():
+            self.signatures[plugin_name] = self.plugin_signature(plugin_name)
+            try:
+                self.read_manifest(plugin_name)
+            except Exception as e:
+                print(f"✗ Error loading plugin {plugin_name}: {e}")
+
         # Clean up config and update plugins list
         self.update_config_plugins()
 
+        warmup = self.manifests if '*' in PLUGIN_WARMUP else PLUGIN_WARMUP
+        for plugin_name in warmup:
+            self.get_plugin(plugin_name)
+
+    @staticmethod
+    def plugin_names():
+        return sorted(plugin_dir.name for plugin_dir in PLUGINS_DIR.glob('*/')
+                      if plugin_dir.is_dir() and (plugin_dir / '__init__.py').exists())
+
+    def read_manifest(self, name):
+        manifest = read_plugin_manifest(PLUGINS_DIR / name / '__init__.py')
+        if manifest is None:
+            # PLUGIN_CONFIG is computed, the module has to run
+            module = self.import_plugin(name)
+            manifest = getattr(module, 'PLUGIN_CONFIG', None)
+        if manifest is None:
+            self.manifests.pop(name, None)
+        else:
+            self.manifests[name] = manifest
+        return manifest
+
+    def import_plugin(self, name, reload=False):
+        """Execute a plugin module (or reuse it if another plugin imported it).
+
+        Handlers and content are built before anything is published, so a
+        module that fails to execute, compile its handlers or produce its
+        content leaves sys.modules and the manager on the previous version.
+        """
+        module_name = f"plugins.{name}"
+        module = None if reload else sys.modules.get(module_name)
+        fresh = module is None
+        if fresh:
+            previous = sys.modules.get(module_name)
+            spec = importlib.util.spec_from_file_location(
+                module_name,
+                PLUGINS_DIR / name / '__init__.py'
+            )
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module  # visible to imports made while it runs
+        try:
+            if fresh:
+                spec.loader.exec_module(module)
+            if hasattr(module, 'PLUGIN_CONFIG'):
+                handlers, batch = self.compile_handlers(name, module)
+                content = self.build_content(name, module)
+        except BaseException:
+            if fresh:
+                if previous is None:
+                    sys.modules.pop(module_name, None)
+                else:
+                    sys.modules[module_name] = previous
+            raise
+        if hasattr(module, 'PLUGIN_CONFIG'):
+            self.install_handlers(name, handlers, batch)
+            self.contents[name] = content
+            self.plugins[name] = module
+            print(f"✓ Plugin loaded: {name}")
+        return module
+
+    @staticmethod
+    def compile_handlers(name, module):
+        """Dispatch table entries of a plugin from PLUGIN_CONFIG['handlers'] and its batch handler"""
+        handlers = {}
+        batch = None
+        for spec in module.PLUGIN_CONFIG.get('handlers', ()):
+            handler = PluginHandler(name, module, spec)
+            handlers.setdefault((name, handler.method), []).append(handler)
+            if handler.batch and batch is None:
+                batch = handler
+        return {key: tuple(value) for key, value in handlers.items()}, batch
+
+    def install_handlers(self, name, handlers, batch):
+        """Publish compiled handlers, replacing (not first removing) the plugin's old ones"""
+        stale = [key for key in self.handlers if key[0] == name and key not in handlers]
+        self.handlers.update(handlers)
+        for key in stale:
+            del self.handlers[key]
+        if batch:
+            self.batch_handlers[name] = batch
+        else:
+            self.batch_handlers.pop(name, None)
+
+    def drop_handlers(self, name):
+        for key in [key for key in self.handlers if key[0] == name]:
+            del self.handlers[key]
+        self.batch_handlers.pop(name, None)
+
+    def get_handlers(self, name, method):
+        return self.handlers.get((name, method), ())
+
+    def get_batch_handler(self, name):
+        return self.batch_handlers.get(name)
+
+    @staticmethod
+    def build_content(name, module):
+        """Serialize get_content() once; the ETag carries the plugin version"""
+        if not hasattr(module, 'get_content'):
+            return None
+        version = module.PLUGIN_CONFIG.get('version', '1.0.0')
+        return JsonPayload(module.get_content(), etag_prefix=f'{name}-{version}')
+
+    def get_content_payload(self, name):
+        return self.contents.get(name)
+
+    def get_template(self, name):
+        """Page template of a plugin (PLUGIN_CONFIG 'template' or plugin_<name>.html)"""
+        return self.manifests.get(name, {}).get('template', f'plugin_{name}.html')
+
+    @staticmethod
+    def plugin_signature(name):
+        """Modification times of a plugin's files and of its page template"""
+        paths = [path for path in (PLUGINS_DIR / name).rglob('*') if '__pycache__' not in path.parts]
+        paths.append(TEMPLATES_DIR / f'plugin_{name}.html')
+        signature = []
+        for path in paths:
+            try:
+                signature.append((str(path), path.stat().st_mtime_ns))
+            except FileNotFoundError:
+                continue
+        return tuple(sorted(signature))
+
+    def start_watcher(self):
+        """Poll plugin directories in a daemon thread (restarted after a fork)"""
+        if self.watcher is None or not self.watcher.is_alive():
+            self.watcher = threading.Thread(target=self.watch, daemon=True)
+            self.watcher.start()
+
+    def watch(self):
+        while True:
+            time.sleep(PLUGIN_WATCH_INTERVAL)
+            try:
+                self.check_changes()
+            except Exception as e:
+                print(f"✗ Plugin watcher error: {e}")
+
+    def check_changes(self):
+        """Reload plugins whose files changed, pick up added and removed ones"""
+        names = set(self.plugin_names())
+        known = set(self.manifests)
+        changed = []
+        for name in sorted(names | set(self.signatures)):
+            signature = self.plugin_signature(name) if name in names else None
+            if signature != self.signatures.get(name):
+                self.signatures[name] = signature
+                changed.append(name)
+        for name in changed:
+            self.reload_plugin(name)
+        if set(self.manifests) != known:
+            self.update_config_plugins()
+
+    def reload_plugin(self, name):
+        """Swap in the current version of a plugin and drop its caches.
+
+        A loaded module is re-executed first and replaces the old one only if
+        that succeeds; requests already holding the old module finish with it.
+        """
+        with self.lock:
+            if not (PLUGINS_DIR / name / '__init__.py').exists():
+                self.manifests.pop(name, None)
+                self.plugins.pop(name, None)
+                self.drop_handlers(name)
+                self.contents.pop(name, None)
+                self.signatures.pop(name, None)
+                sys.modules.pop(f"plugins.{name}", None)
+                print(f"✓ Plugin removed: {name}")
+            else:
+                try:
+                    if name in self.plugins:
+                        self.import_plugin(name, reload=True)
+                    else:
+                        sys.modules.pop(f"plugins.{name}", None)
+                    self.read_manifest(name)
+                except Exception as e:
+                    print(f"✗ Error reloading plugin {name}: {e}")
+                    return
+
+        result_cache.invalidate(plugin=name)
+        response_cache.invalidate_prefix(f'plugin:{name}')
+        page_cache.invalidate(f'plugin:{name}')
+        templates = app.jinja_env.cache
+        if templates is not None:
+            for key in [k for k in templates.keys() if k[1] == f'plugin_{name}.html']:
+                try:
+                    del templates[key]
+                except KeyError:
+                    pass
+
     def update_config_plugins(self):
         """Clean up missing plugins and add new ones to config"""
         config = load_config()
         
         # Get current plugin names from filesystem
-        current_plugin_names = set(self.plugins.keys())
+        current_plugin_names = set(self.manifests.keys())
         
         # Get enabled plugins from config
         enabled_plugins = set(config.get('enabled_plugins', []))
@@ -341,16 +2207,24 @@ class PluginManager:
                 print(f"✓ Removed missing plugins from config: {list(removed)}")
 
     def get_plugin(self, name):
-        return self.plugins.get(name)
+        """Plugin module, imported on first use"""
+        plugin = self.plugins.get(name)
+        if plugin is not None or name not in self.manifests:
+            return plugin
+        with self.lock:
+            if name not in self.plugins:
+                try:
+                    self.import_plugin(name)
+                except Exception as e:
+                    print(f"✗ Error loading plugin {name}: {e}")
+            return self.plugins.get(name)
 
     def get_all_plugins(self):
-        return self.plugins
+        """Manifests (PLUGIN_CONFIG) of all discovered plugins"""
+        return self.manifests
 
     def get_plugin_config(self, name):
-        plugin = self.get_plugin(name)
-        if plugin and hasattr(plugin, 'PLUGIN_CONFIG'):
-            return plugin.PLUGIN_CONFIG
-        return None
+        return self.manifests.get(name)
 
 
 plugin_manager = PluginManager()
@@ -360,7 +2234,7 @@ plugin_manager = PluginManager()
 @app.errorhandler(404)
 def not_found_error(error):
     """Handle 404 Not Found errors"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('errors.html', 
                         error_code='404',
                         error_title='Страница не найдена',
@@ -371,7 +2245,7 @@ def not_found_error(error):
 @app.errorhandler(403)
 def forbidden_error(error):
     """Handle 403 Forbidden errors"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('errors.html', 
                         error_code='403',
                         error_title='Доступ запрещен',
@@ -382,7 +2256,7 @@ def forbidden_error(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 Internal Server Error"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('errors.html', 
                         error_code='500',
                         error_title='Внутренняя ошибка сервера',
@@ -393,7 +2267,7 @@ def internal_error(error):
 @app.errorhandler(400)
 def bad_request_error(error):
     """Handle 400 Bad Request errors"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('errors.html', 
                         error_code='400',
                         error_title='Неверный запрос',
@@ -404,7 +2278,7 @@ def bad_request_error(error):
 @app.errorhandler(401)
 def unauthorized_error(error):
     """Handle 401 Unauthorized errors"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('errors.html', 
                         error_code='401',
                         error_title='Требуется авторизация',
@@ -421,7 +2295,7 @@ def handle_exception(error):
     print(f"Unhandled exception: {error}")
     print(traceback.format_exc())
     
-    config = load_config()
+    config = config_snapshot()
     
     # Don't expose internal errors in production
     if app.debug:
@@ -443,15 +2317,15 @@ def handle_exception(error):
 def index():
     """Main page"""
     record_visit()  # Record visit
-    config = load_config()
-    return render_template('index.html', config=config)
+    config = config_snapshot()
+    return cached_page_response('index', config_store.version, 'index.html', config=config)
 
 
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get application configuration"""
-    config = load_config()
-    return jsonify(config)
+    return cached_json_response('config', config_store.version, config_snapshot,
+                                CACHE_CONTROL_REVALIDATE)
 
 
 @app.route('/api/config', methods=['POST'])
@@ -478,21 +2352,28 @@ def update_config():
 @app.route('/api/plugins')
 def get_plugins():
     """Get all available plugins with enabled status"""
-    config = load_config()
+    plugins = plugin_manager.get_all_plugins()
+    version = (config_store.version,
+               tuple((name, id(manifest)) for name, manifest in plugins.items()))
+    return cached_json_response('plugins', version, build_plugins_info,
+                                CACHE_CONTROL_REVALIDATE)
+
+
+def build_plugins_info():
+    """Plugin list with enabled status for /api/plugins"""
+    config = config_snapshot()
     enabled_plugins = config.get('enabled_plugins', ['periodic_table', 'le_chatelier'])
 
     plugins_info = {}
-    for name, plugin in plugin_manager.get_all_plugins().items():
-        if hasattr(plugin, 'PLUGIN_CONFIG'):
-            plugin_config = plugin.PLUGIN_CONFIG
-            plugins_info[name] = {
-                'name': plugin_config['name'],
-                'description': plugin_config.get('description', ''),
-                'icon': plugin_config.get('icon', 'grid'),
-                'version': plugin_config.get('version', '1.0.0'),
-                'enabled': name in enabled_plugins
-            }
-    return jsonify(plugins_info)
+    for name, plugin_config in plugin_manager.get_all_plugins().items():
+        plugins_info[name] = {
+            'name': plugin_config['name'],
+            'description': plugin_config.get('description', ''),
+            'icon': plugin_config.get('icon', 'grid'),
+            'version': plugin_config.get('version', '1.0.0'),
+            'enabled': name in enabled_plugins
+        }
+    return plugins_info
 
 
 @app.route('/api/plugins/<name>/toggle', methods=['POST'])
@@ -520,15 +2401,35 @@ def get_visit_statistics():
     return jsonify(stats)
 
 
+@app.route('/api/admin/visits/queue')
+@login_required
+def get_visit_queue_statistics():
+    """Get visit queue depth and dropped visits of this worker"""
+    return jsonify(visit_store.stats())
+
+
+@app.route('/api/admin/cache')
+@login_required
+def get_cache_statistics():
+    """Get plugin result cache counters"""
+    return jsonify(result_cache.stats())
+
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     """Admin login page"""
-    config = load_config()
+    config = config_snapshot()
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
 
-        if check_credentials(username, password):
+        try:
+            valid = check_credentials(username, password)
+        except PasswordBusyError:
+            return render_template('login.html', config=config,
+                                   error='Сервер занят, попробуйте войти ещё раз'), 503
+
+        if valid:
             session['logged_in'] = True
             session['username'] = username
             return redirect(url_for('admin'))
@@ -549,15 +2450,16 @@ def logout():
 @login_required
 def admin():
     """Admin dashboard"""
-    config = load_config()
+    config = config_snapshot()
     return render_template('admin.html', config=config)
 
 
 @app.route('/api/admin/tiles', methods=['GET'])
 def get_tiles():
     """Get tile configuration"""
-    config = load_config()
-    return jsonify(config.get('tiles', []))
+    return cached_json_response('tiles', config_store.version,
+                                lambda: config_snapshot().get('tiles', []),
+                                CACHE_CONTROL_REVALIDATE)
 
 
 @app.route('/api/admin/tiles', methods=['POST'])
@@ -574,11 +2476,9 @@ def save_tiles():
 @app.route('/api/admin/posts', methods=['GET'])
 def get_posts():
     """Get all posts"""
-    posts_file = DATA_DIR / 'posts.json'
-    if posts_file.exists():
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            return jsonify(json.load(f))
-    return jsonify([])
+    return cached_json_response('posts', post_store.version(), post_store.all_posts,
+                                CACHE_CONTROL_REVALIDATE,
+                                last_modified=post_store.last_modified())
 
 
 @app.route('/api/admin/posts', methods=['POST'])
@@ -586,23 +2486,15 @@ def get_posts():
 def create_post():
     """Create new post"""
     data = request.json
-    posts_file = DATA_DIR / 'posts.json'
-    if posts_file.exists():
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-    else:
-        posts = []
-
     post = {
-        'id': int(datetime.now().timestamp() * 1000),
+        'id': post_store.new_id(),
         'title': data.get('title', ''),
         'content': data.get('content', ''),
         'created_at': datetime.now().isoformat(),
         'updated_at': datetime.now().isoformat()
     }
 
-    posts.append(post)
-    save_posts(posts)
+    post_store.put(post)
     return jsonify(post)
 
 
@@ -611,40 +2503,45 @@ def create_post():
 def update_post(post_id):
     """Update post"""
     data = request.json
-    posts_file = DATA_DIR / 'posts.json'
-    if posts_file.exists():
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-    else:
-        posts = []
-
-    for post in posts:
-        if post['id'] == post_id:
-            post['title'] = data.get('title', post['title'])
-            post['content'] = data.get('content', post['content'])
-            post['updated_at'] = datetime.now().isoformat()
-            save_posts(posts)
-            return jsonify(post)
-
-    return jsonify({'error': 'Post not found'}), 404
+    post = post_store.get(post_id)
+    if post is None:
+        return jsonify({'error': 'Post not found'}), 404
+
+    post['title'] = data.get('title', post['title'])
+    post['content'] = data.get('content', post['content'])
+    post['updated_at'] = datetime.now().isoformat()
+    post_store.put(post)
+    page_cache.invalidate(f'post:{post_id}')
+    return jsonify(post)
 
 
 @app.route('/api/admin/posts/<int:post_id>', methods=['DELETE'])
 @login_required
 def delete_post(post_id):
     """Delete post"""
-    posts_file = DATA_DIR / 'posts.json'
-    if posts_file.exists():
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-    else:
-        posts = []
-
-    posts = [p for p in posts if p['id'] != post_id]
-    save_posts(posts)
+    post_store.delete(post_id)
+    page_cache.invalidate(f'post:{post_id}')
     return jsonify({'success': True})
 
 
+@app.route('/api/admin/posts/export')
+@login_required
+def export_posts():
+    """Stream all posts as NDJSON"""
+    return app.response_class(post_store.export_lines(), mimetype='application/x-ndjson')
+
+
+@app.route('/api/admin/posts/import', methods=['POST'])
+@login_required
+def import_posts():
+    """Import posts from an NDJSON body, one post per line"""
+    try:
+        imported = post_store.import_lines(request.stream)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid NDJSON: {e}'}), 400
+    return jsonify({'success': True, 'imported': imported})
+
+
 @app.route('/api/admin/change-password', methods=['POST'])
 @login_required
 def change_password():
@@ -654,17 +2551,16 @@ def change_password():
     new_password = data.get('new_password')
 
     username = session.get('username')
-    users_file = DATA_DIR / 'users.json'
+    user = user_store.get(username)
 
-    if users_file.exists():
-        with open(users_file, 'r', encoding='utf-8') as f:
-            users = json.load(f)
-
-        if username in users and users[username]['password'] == hash_password(old_password):
-            users[username]['password'] = hash_password(new_password)
-            with open(users_file, 'w', encoding='utf-8') as f:
-                json.dump(users, f, ensure_ascii=False, indent=2)
+    try:
+        if (user is not None and old_password and new_password and
+                password_hasher.verify(old_password, user['password'])):
+            user['password'] = password_hasher.hash(new_password)
+            user_store.put(username, user)
             return jsonify({'success': True})
+    except PasswordBusyError:
+        return jsonify({'error': 'Сервер занят, попробуйте ещё раз'}), 503
 
     return jsonify({'error': 'Неверный текущий пароль'}), 400
 
@@ -673,27 +2569,13 @@ def change_password():
 def view_plugin(name):
     """View plugin page"""
     record_visit()  # Record visit
-    plugin = plugin_manager.get_plugin(name)
-    if not plugin:
+    if plugin_manager.get_plugin_config(name) is None:
         return "Plugin not found", 404
 
-    config = load_config()
+    config = config_snapshot()
 
-    template_map = {
-        'periodic_table': 'plugin_periodic_table.html',
-        'le_chatelier': 'plugin_le_chatelier.html',
-        'Ionic_equation': 'plugin_Ionic_equation.html',
-        'solubility_table': 'plugin_solubility_table.html',
-        'balancing_chemical_equations': 'plugin_balancing_chemical_equations.html',
-        'electrochemical_voltage_series': 'plugin_electrochemical_voltage_series.html',
-        'hydrocarbon_equations': 'plugin_hydrocarbon_equations.html',
-        'molar_mass_calculator': 'plugin_molar_mass_calculator.html',
-        'classification_and_nomenclature': 'plugin_classification_and_nomenclature.html',
-        'equals': 'plugin_equals.html'
-    }
-
-    template = template_map.get(name, f'plugin_{name}.html')
-    return render_template(template, config=config)
+    template = plugin_manager.get_template(name)
+    return cached_page_response(f'plugin:{name}', config_store.version, template, config=config)
 
 
 @app.route('/api/plugin/<name>', methods=['GET', 'POST'])
@@ -703,51 +2585,106 @@ def get_plugin_content(name):
     if not plugin:
         return jsonify({'error': 'Plugin not found'}), 404
 
-    # Обработка POST запросов для плагинов с расчетами
+    # Обработчики, объявленные плагином в PLUGIN_CONFIG['handlers']
     if request.method == 'POST':
-        if name == 'Ionic_equation':
-            data = request.json
-            equation = data.get('equation', '')
-            if equation and hasattr(plugin, 'solve_ionic_equation'):
-                result = plugin.solve_ionic_equation(equation)
-                return jsonify(result)
-            return jsonify({'error': 'Invalid request'}), 400
-
-    # Обработка GET запросов
-    if name == 'le_chatelier':
-        equation = request.args.get('equation')
-        if equation and hasattr(plugin, 'calculate_equilibrium'):
-            result = plugin.calculate_equilibrium(equation)
-            return jsonify(result)
-
-    if hasattr(plugin, 'get_content'):
-        content = plugin.get_content()
-        return jsonify(content)
+        data = request.get_json(silent=True)
+        args = data if isinstance(data, dict) else {}
+    else:
+        args = request.args
+    handlers = plugin_manager.get_handlers(name, request.method)
+    for handler in handlers:
+        if handler.matches(args):
+            return handler.respond(args)
+    if request.method == 'POST' and handlers:
+        return jsonify({'error': 'Invalid request'}), 400
+
+    payload = plugin_manager.get_content_payload(name)
+    if payload is not None:
+        return json_payload_response(payload, cache_control=CACHE_CONTROL_PLUGIN)
 
     return jsonify({'error': 'Plugin has no content'})
 
 
+def read_batch_items(field):
+    """Batch items from a JSON array, {field: [...]} or a newline-delimited body"""
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get(field)
+        if not isinstance(data, list):
+            return None
+        return [str(item) for item in data]
+    body = request.get_data(as_text=True)
+    return [line.strip() for line in body.splitlines() if line.strip()]
+
+
+@app.route('/api/plugin/<name>/batch', methods=['POST'])
+def plugin_batch(name):
+    """Solve a batch of inputs, streaming one NDJSON result per line"""
+    plugin = plugin_manager.get_plugin(name)
+    if not plugin:
+        return jsonify({'error': 'Plugin not found'}), 404
+
+    handler = plugin_manager.get_batch_handler(name)
+    if handler is None:
+        return jsonify({'error': 'Plugin does not support batch requests'}), 400
+    field = handler.batch
+    solve = handler.compute
+
+    items = read_batch_items(field)
+    if items is None:
+        return jsonify({'error': f'Expected a JSON array or {{"{field}": [...]}}'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many items, maximum is {BATCH_MAX_ITEMS}'}), 413
+
+    def generate():
+        for index, item in enumerate(items):
+            result = solve(item)
+            yield json.dumps({'index': index, 'input': item, 'result': result},
+                             ensure_ascii=False) + '\n'
+
+    return app.response_class(generate(), mimetype='application/x-ndjson')
+
+
 @app.route('/post/<int:post_id>')
 def view_post(post_id):
     """View individual post"""
     record_visit()  # Record visit
-    posts_file = DATA_DIR / 'posts.json'
-    config = load_config()
+    config = config_snapshot()
 
-    if posts_file.exists():
-        with open(posts_file, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-
-        for post in posts:
-            if post['id'] == post_id:
-                # Format date for display
-                date = datetime.fromisoformat(post['updated_at'])
-                post['updated_at'] = date.strftime('%d %B %Y, %H:%M')
-                return render_template('post.html', post=post, config=config)
+    post = post_store.get(post_id)
+    if post is not None:
+        version = (config_store.version, post['updated_at'])
+        # Format date for display
+        date = datetime.fromisoformat(post['updated_at'])
+        post['updated_at'] = date.strftime('%d %B %Y, %H:%M')
+        return cached_page_response(f'post:{post_id}', version, 'post.html',
+                                    post=post, config=config)
 
     return "Post not found", 404
 
 
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a content-hashed bundle, precompressed when the client accepts it"""
+    path = safe_join(str(ASSETS_DIR), filename)
+    if path is None or not os.path.isfile(path) or filename == ASSETS_MANIFEST.name:
+        abort(404)
+
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+            path, encoding = path + suffix, candidate
+            break
+
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = CACHE_CONTROL_IMMUTABLE
+    response.vary.add('Accept-Encoding')
+    return response
+
+
 @app.route('/data/elements')
 def get_elements_data():
     """
@@ -767,14 +2704,9 @@ def get_elements_data():
     - /data/elements?period=2 - Get all period 2 elements
     - /data/elements - Get all elements
     """
-    elements_file = DATA_DIR / 'elements.json'
-
-    if not elements_file.exists():
+    if element_repository is None:
         return jsonify({'error': 'Elements data not found'}), 404
 
-    with open(elements_file, 'r', encoding='utf-8') as f:
-        elements = json.load(f)
-
     # Handle specific queries
     symbol = request.args.get('symbol')
     number = request.args.get('number')
@@ -785,58 +2717,95 @@ def get_elements_data():
     # Get specific element by symbol
     if symbol:
         symbol = symbol.upper()
-        if symbol in elements:
-            return jsonify(elements[symbol])
+        payload = element_repository.by_symbol.get(symbol)
+        if payload:
+            return json_payload_response(payload, **ELEMENTS_CACHING)
         return jsonify({'error': f'Element {symbol} not found'}), 404
 
     # Get specific element by number
     if number:
         try:
             num = int(number)
-            for sym, data in elements.items():
-                if data['number'] == num:
-                    return jsonify(data)
-            return jsonify({'error': f'Element with number {num} not found'}), 404
         except ValueError:
             return jsonify({'error': 'Invalid atomic number'}), 400
+        payload = element_repository.by_number.get(num)
+        if payload:
+            return json_payload_response(payload, **ELEMENTS_CACHING)
+        return jsonify({'error': f'Element with number {num} not found'}), 404
 
     # Filter by category
     if category:
-        filtered = [{'symbol': sym, **data} for sym, data in elements.items()
-                    if data['category'] == category]
-        return jsonify(filtered)
+        return json_payload_response(element_repository.filtered('category', category), **ELEMENTS_CACHING)
 
     # Filter by period
     if period:
         try:
-            per = int(period)
-            filtered = [{'symbol': sym, **data} for sym, data in elements.items()
-                        if data['period'] == per]
-            return jsonify(filtered)
+            return json_payload_response(element_repository.filtered('period', int(period)), **ELEMENTS_CACHING)
         except ValueError:
             return jsonify({'error': 'Invalid period number'}), 400
 
     # Filter by group
     if group:
         try:
-            grp = int(group)
-            filtered = [{'symbol': sym, **data} for sym, data in elements.items()
-                        if data['group'] == grp]
-            return jsonify(filtered)
+            return json_payload_response(element_repository.filtered('group', int(group)), **ELEMENTS_CACHING)
         except ValueError:
             return jsonify({'error': 'Invalid group number'}), 400
 
     # Return all elements as array (default)
-    elements_array = [{'symbol': sym, **data} for sym, data in elements.items()]
-    return jsonify(elements_array)
+    return json_payload_response(element_repository.all, **ELEMENTS_CACHING)
 
 
-def save_posts(posts):
-    """Save posts to file"""
-    posts_file = DATA_DIR / 'posts.json'
-    with open(posts_file, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, ensure_ascii=False, indent=2)
+# Startup
+startup_lock = threading.Lock()
+started = False
+background_pid = None
+
+
+def startup():
+    """One-time startup work: storage, default admin, plugin discovery and warmup.
+
+    Runs once per process from create_app() (or on the first request when
+    the app object is served directly, e.g. by ``flask run``). The
+    production server (see gunicorn.conf.py) preloads the app, so this
+    happens once in the master and the forked workers share the loaded
+    data copy-on-write.
+    """
+    global started
+    with startup_lock:
+        if started:
+            return
+        open_data()
+        init_admin()
+        plugin_manager.load_plugins()
+        started = True
+
+
+def start_background_tasks():
+    """Start the threads of this process (plugin watcher, visit writer)"""
+    global background_pid
+    with startup_lock:
+        if background_pid == os.getpid():
+            return
+        background_pid = os.getpid()
+    if PLUGIN_WATCH:
+        plugin_manager.start_watcher()
+    visit_store.start_writer()
+
+
+@app.before_request
+def ensure_background_tasks():
+    if not started:
+        startup()  # app served without create_app()
+    # Threads do not survive a fork: start them in the process serving requests
+    if background_pid != os.getpid():
+        start_background_tasks()
+
+
+def create_app():
+    """WSGI application factory (see wsgi.py)"""
+    startup()
+    return app
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=1253, debug=True)
+    create_app().run(host='0.0.0.0', port=1253, debug=True)
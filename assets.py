@@ -0,0 +1,183 @@
+"""
+Static asset pipeline for inline template scripts and styles.
+
+The build step moves every inline <script> and <style> block of the
+templates that contains no Jinja syntax into a content-hashed file in
+static/dist, with .gz (and .br when the brotli module is installed)
+variants next to it, and records them in static/dist/manifest.json.
+
+At run time BundledTemplateLoader swaps such a block for a <script src>
+or <link> tag when the manifest has a bundle built from exactly that
+block, so a template edited after the last build keeps its inline code.
+
+Usage (from the project root):
+    python assets.py
+"""
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from jinja2 import FileSystemLoader
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent
+TEMPLATES_DIR = ROOT / 'templates'
+DIST_DIR = ROOT / 'static' / 'dist'
+MANIFEST_FILE = DIST_DIR / 'manifest.json'
+ASSETS_URL = '/assets/'
+
+INLINE_BLOCK = re.compile(r'<(script|style)\b([^>]*)>(.*?)</\1\s*>', re.S | re.I)
+JINJA_SYNTAX = re.compile(r'{[{%#]')
+SCRIPT_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+CSS_TOKENS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+EXTENSIONS = {'script': 'js', 'style': 'css'}
+
+
+def block_digest(kind, attrs, content):
+    """Identity of an inline block, used to match it against the manifest"""
+    return hashlib.sha256(f'{kind}\0{attrs}\0{content}'.encode('utf-8')).hexdigest()[:20]
+
+
+def is_bundleable(kind, attrs, content):
+    """Inline block without Jinja syntax that can live in a separate file"""
+    if not content.strip() or JINJA_SYNTAX.search(content):
+        return False
+    if re.search(r'<(script|style)\b', content, re.I):
+        return False  # malformed nesting, leave it alone
+    if kind == 'script':
+        if re.search(r'\bsrc\s*=', attrs, re.I):
+            return False
+        script_type = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]*)', attrs, re.I)
+        return (script_type.group(1).lower() if script_type else '') in SCRIPT_TYPES
+    return True
+
+
+def minify_css(css):
+    """Drop comments and collapse whitespace outside of strings"""
+    parts = []
+    position = 0
+    for match in CSS_TOKENS.finditer(css):
+        parts.append(_collapse_css(css[position:match.start()]))
+        if not match.group().startswith('/*'):
+            parts.append(match.group())
+        position = match.end()
+    parts.append(_collapse_css(css[position:]))
+    return ''.join(parts).strip()
+
+
+def _collapse_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_js(js):
+    """Drop blank lines and trailing whitespace.
+
+    Deliberately conservative: indentation and comments may sit inside
+    template literals or regular expressions, so they are left as they are
+    (gzip/brotli remove most of their cost anyway).
+    """
+    lines = (line.rstrip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line.strip()) + '\n'
+
+
+def compress_variants(path, data):
+    """Write .gz (and .br) variants of ``data`` next to ``path``"""
+    Path(f'{path}.gz').write_bytes(gzip.compress(data, 9, mtime=0))
+    if brotli is not None:
+        Path(f'{path}.br').write_bytes(brotli.compress(data, quality=11))
+
+
+def build(templates_dir=TEMPLATES_DIR, dist_dir=DIST_DIR):
+    """Extract inline blocks into hashed bundles and write the manifest"""
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    written = set()
+    for template in sorted(templates_dir.glob('*.html')):
+        source = template.read_text(encoding='utf-8')
+        entries = {}
+        for index, match in enumerate(INLINE_BLOCK.finditer(source)):
+            kind, attrs, content = match.group(1).lower(), match.group(2), match.group(3)
+            if not is_bundleable(kind, attrs, content):
+                continue
+            code = minify_js(content) if kind == 'script' else minify_css(content)
+            data = code.encode('utf-8')
+            content_hash = hashlib.sha256(data).hexdigest()[:12]
+            name = f'{template.stem}-{index}.{content_hash}.{EXTENSIONS[kind]}'
+            path = dist_dir / name
+            if not path.exists():
+                path.write_bytes(data)
+                compress_variants(path, data)
+            written.update({name, f'{name}.gz', f'{name}.br'})
+            entries[block_digest(kind, attrs, content)] = name
+        if entries:
+            manifest[template.name] = entries
+
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    for stale in dist_dir.iterdir():
+        if stale.name not in written and stale != MANIFEST_FILE:
+            stale.unlink()
+    return manifest
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bundle_tag(kind, attrs, name):
+    if kind == 'script':
+        return f'<script{attrs} src="{ASSETS_URL}{name}"></script>'
+    return f'<link rel="stylesheet"{attrs} href="{ASSETS_URL}{name}">'
+
+
+class BundledTemplateLoader(FileSystemLoader):
+    """Template loader that replaces built inline blocks with bundle tags"""
+
+    def __init__(self, searchpath, manifest_path=MANIFEST_FILE):
+        super().__init__(searchpath)
+        self.manifest_path = manifest_path
+        self.manifest_mtime = None
+        self.manifest = {}
+
+    def manifest_signature(self):
+        try:
+            return self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        signature = self.manifest_signature()
+        if signature != self.manifest_mtime:
+            self.manifest = load_manifest(self.manifest_path) if signature else {}
+            self.manifest_mtime = signature
+        bundles = self.manifest.get(template)
+        if bundles:
+            def replace(match):
+                kind, attrs, content = match.group(1).lower(), match.group(2), match.group(3)
+                name = bundles.get(block_digest(kind, attrs, content))
+                return bundle_tag(kind, attrs, name) if name else match.group()
+
+            source = INLINE_BLOCK.sub(replace, source)
+
+        def is_uptodate():
+            return uptodate() and self.manifest_signature() == signature
+
+        return source, filename, is_uptodate
+
+
+if __name__ == '__main__':
+    built = build()
+    count = sum(len(entries) for entries in built.values())
+    print(f"✓ Built {count} bundles from {len(built)} templates into {DIST_DIR}")
@@ -0,0 +1,79 @@
+"""
+HTTP throughput of a running server.
+
+Keeps ``concurrency`` keep-alive connections busy with GET requests over
+the given paths and reports requests per second and latency percentiles.
+
+Usage (from the project root):
+    python benchmarks/http_throughput.py http://127.0.0.1:1253 [seconds] [concurrency] [path ...]
+"""
+import http.client
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+PATHS = [
+    '/',
+    '/plugin/equals',
+    '/api/plugins',
+    '/api/plugin/solubility_table',
+    '/data/elements',
+]
+
+
+def worker(host, port, paths, deadline, latencies, errors):
+    """Issue requests until ``deadline``, recording latencies in seconds"""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    headers = {'Accept-Encoding': 'gzip'}
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main():
+    url = urlsplit(sys.argv[1] if len(sys.argv) > 1 else 'http://127.0.0.1:1253')
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    paths = sys.argv[4:] or PATHS
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker,
+                                args=(url.hostname, url.port or 80, paths, deadline, latencies, errors))
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+    print(f'{len(latencies) / duration:10.0f} req/s  '
+          f'p50 {percentile(0.5):.1f} ms  p99 {percentile(0.99):.1f} ms  '
+          f'errors {len(errors)}  ({concurrency} connections, {duration:.0f} s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Microbenchmark of the Ionic_equation plugin.
+
+Compares the old per-request path (a new IonicEquationSolver for every
+call) with the shared solver used by solve_ionic_equation().
+
+Usage (from the project root):
+    python benchmarks/ionic_equation.py [seconds]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from plugins.Ionic_equation import IonicEquationSolver, solve_ionic_equation  # noqa: E402
+
+EQUATIONS = [
+    'NaCl + AgNO3',
+    'HCl + NaOH',
+    'BaCl2 + Na2SO4',
+    'CaCO3 + HCl',
+    'NaCl + AgNO3 = AgCl + NaNO3',
+]
+
+
+def measure(solve, duration):
+    """Calls per second of ``solve`` over the example equations"""
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for equation in EQUATIONS:
+            solve(equation)
+        calls += len(EQUATIONS)
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    before = measure(lambda eq: IonicEquationSolver().solve_ionic_equation(eq), duration)
+    after = measure(solve_ionic_equation, duration)
+    print(f'new solver per request: {before:10.0f} req/s')
+    print(f'shared solver:          {after:10.0f} req/s')
+    print(f'speedup:                {after / before:10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Gunicorn settings for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+The app is preloaded in the master: startup side effects (default admin,
+config cleanup, plugin import) run once, and the workers fork with the
+plugins, elements and solubility data already in memory, shared
+copy-on-write. Background threads are started in each worker after the
+fork.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('CHEMCENTER_BIND', '0.0.0.0:1253')
+workers = int(os.environ.get('CHEMCENTER_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('CHEMCENTER_THREADS', 4))
+preload_app = True
+timeout = 30
+accesslog = os.environ.get('CHEMCENTER_ACCESS_LOG')  # '-' for stdout
+
+# Import every plugin in the master instead of on first use in each worker
+os.environ.setdefault('CHEMCENTER_PLUGIN_WARMUP', '*')
+# Tell the other workers about config writes through the shared counter
+os.environ.setdefault('CHEMCENTER_CONFIG_NOTIFY', '1')
+
+
+def when_ready(server):
+    # Keep the preloaded objects out of the collector so that gc passes in
+    # the workers do not touch (and copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_background_tasks
+    start_background_tasks()
@@ -1,4 +1,5 @@
 import re
+import threading
 from typing import Dict, List, Tuple, Optional
 
 PLUGIN_CONFIG = {
@@ -7,7 +8,11 @@ PLUGIN_CONFIG = {
     'icon': 'fa-flask-vial',
     'version': '1.0.0',
     'enabled': True,
-    'route': '/plugin/Ionic_equation'
+    'route': '/plugin/Ionic_equation',
+    'handlers': [
+        {'method': 'POST', 'params': ['equation'], 'handler': 'solve_ionic_equation',
+         'normalize': 'ordered_equation', 'cacheable': True, 'batch': 'equations'}
+    ]
 }
 
 # Импортируем таблицу растворимости
@@ -21,12 +26,53 @@ except ImportError:
         SOLUBILITY_MATRIX = {}
         SOLUBILITY_DATA = {}
 
+# Общий разборщик формул
+try:
+    from plugins.formula import FormulaError, parse_formula
+except ImportError:
+    from formula import FormulaError, parse_formula
+
+
+# Формулы соединений по паре ионов
+COMMON_FORMULAS = {
+    ('Na⁺', 'Cl⁻'): 'NaCl',
+    ('K⁺', 'Cl⁻'): 'KCl',
+    ('H⁺', 'Cl⁻'): 'HCl',
+    ('Na⁺', 'OH⁻'): 'NaOH',
+    ('K⁺', 'OH⁻'): 'KOH',
+    ('Ag⁺', 'NO₃⁻'): 'AgNO3',
+    ('Ag⁺', 'Cl⁻'): 'AgCl',
+    ('Na⁺', 'NO₃⁻'): 'NaNO3',
+    ('Ba²⁺', 'Cl⁻'): 'BaCl2',
+    ('Na⁺', 'SO₄²⁻'): 'Na2SO4',
+    ('Ba²⁺', 'SO₄²⁻'): 'BaSO4',
+    ('H⁺', 'SO₄²⁻'): 'H2SO4',
+    ('Na⁺', 'CO₃²⁻'): 'Na2CO3',
+    ('Ca²⁺', 'CO₃²⁻'): 'CaCO3',
+    ('Ca²⁺', 'Cl⁻'): 'CaCl2',
+    ('Mg²⁺', 'Cl⁻'): 'MgCl2',
+    ('Al³⁺', 'Cl⁻'): 'AlCl3',
+    ('Fe³⁺', 'Cl⁻'): 'FeCl3',
+    ('Cu²⁺', 'Cl⁻'): 'CuCl2',
+    ('Pb²⁺', 'Cl⁻'): 'PbCl2',
+    ('Ca²⁺', 'OH⁻'): 'Ca(OH)2',
+    ('Mg²⁺', 'OH⁻'): 'Mg(OH)2',
+    ('Al³⁺', 'OH⁻'): 'Al(OH)3',
+    ('Fe³⁺', 'OH⁻'): 'Fe(OH)3',
+    ('Cu²⁺', 'OH⁻'): 'Cu(OH)2',
+    ('H⁺', 'OH⁻'): 'H2O',
+}
+
 
 class IonicEquationSolver:
     """Класс для решения ионных уравнений"""
 
     def __init__(self):
+        self.pair_index = {}
+        self.ion_index = {}
+        self.composition_index = {}
         self.compound_db = self.build_compound_database()
+        self.build_indexes()
 
     def build_compound_database(self) -> Dict[str, Dict]:
         """Строит базу данных соединений из таблицы растворимости"""
@@ -90,43 +136,22 @@ class IonicEquationSolver:
 
     def generate_formula(self, cation: str, anion: str) -> Optional[str]:
         """Генерирует формулу из ионов"""
-        try:
-            cation_base = cation.replace('⁺', '').replace('²⁺', '').replace('³⁺', '')
-            anion_base = anion.replace('⁻', '').replace('²⁻', '').replace('³⁻', '')
-
-            # Простые случаи
-            common_formulas = {
-                ('Na⁺', 'Cl⁻'): 'NaCl',
-                ('K⁺', 'Cl⁻'): 'KCl',
-                ('H⁺', 'Cl⁻'): 'HCl',
-                ('Na⁺', 'OH⁻'): 'NaOH',
-                ('K⁺', 'OH⁻'): 'KOH',
-                ('Ag⁺', 'NO₃⁻'): 'AgNO3',
-                ('Ag⁺', 'Cl⁻'): 'AgCl',
-                ('Na⁺', 'NO₃⁻'): 'NaNO3',
-                ('Ba²⁺', 'Cl⁻'): 'BaCl2',
-                ('Na⁺', 'SO₄²⁻'): 'Na2SO4',
-                ('Ba²⁺', 'SO₄²⁻'): 'BaSO4',
-                ('H⁺', 'SO₄²⁻'): 'H2SO4',
-                ('Na⁺', 'CO₃²⁻'): 'Na2CO3',
-                ('Ca²⁺', 'CO₃²⁻'): 'CaCO3',
-                ('Ca²⁺', 'Cl⁻'): 'CaCl2',
-                ('Mg²⁺', 'Cl⁻'): 'MgCl2',
-                ('Al³⁺', 'Cl⁻'): 'AlCl3',
-                ('Fe³⁺', 'Cl⁻'): 'FeCl3',
-                ('Cu²⁺', 'Cl⁻'): 'CuCl2',
-                ('Pb²⁺', 'Cl⁻'): 'PbCl2',
-                ('Ca²⁺', 'OH⁻'): 'Ca(OH)2',
-                ('Mg²⁺', 'OH⁻'): 'Mg(OH)2',
-                ('Al³⁺', 'OH⁻'): 'Al(OH)3',
-                ('Fe³⁺', 'OH⁻'): 'Fe(OH)3',
-                ('Cu²⁺', 'OH⁻'): 'Cu(OH)2',
-                ('H⁺', 'OH⁻'): 'H2O',
-            }
-
-            return common_formulas.get((cation, anion))
-        except:
-            return None
+        return self.pair_index.get((cation, anion)) or COMMON_FORMULAS.get((cation, anion))
+
+    def build_indexes(self):
+        """Строит индексы: (катион, анион) → формула, ион → соединения, состав → формула"""
+        self.pair_index = {}
+        self.ion_index = {}
+        self.composition_index = {}
+        for formula, info in self.compound_db.items():
+            self.composition_index.setdefault(parse_formula(formula), formula)
+            self.pair_index.setdefault((info['cation'], info['anion']), formula)
+            self.ion_index.setdefault(info['cation'], []).append(formula)
+            self.ion_index.setdefault(info['anion'], []).append(formula)
+
+    def get_compounds_with_ion(self, ion: str) -> List[str]:
+        """Возвращает формулы соединений, содержащих ион"""
+        return self.ion_index.get(ion, [])
 
     def solve_ionic_equation(self, equation_str: str) -> Dict:
         """
@@ -231,8 +256,16 @@ class IonicEquationSolver:
         return compounds
 
     def get_compound_info(self, formula: str) -> Optional[Dict]:
-        """Возвращает информацию о соединении"""
-        return self.compound_db.get(formula)
+        """Возвращает информацию о соединении (в том числе по составу: NaNO₃, NO3Na)"""
+        info = self.compound_db.get(formula)
+        if info is None:
+            try:
+                known = self.composition_index.get(parse_formula(formula))
+            except FormulaError:
+                return None
+            if known:
+                info = self.compound_db[known]
+        return info
 
     def generate_ionic_equations(self, reactants: List[str], products: List[str], original_eq: str) -> Dict:
         """Генерирует полные и сокращенные ионные уравнения"""
@@ -378,6 +411,20 @@ class IonicEquationSolver:
         return notes
 
 
+_solver = None
+_solver_lock = threading.Lock()
+
+
+def get_solver() -> IonicEquationSolver:
+    """Возвращает общий для процесса экземпляр решателя (строится один раз)"""
+    global _solver
+    if _solver is None:
+        with _solver_lock:
+            if _solver is None:
+                _solver = IonicEquationSolver()
+    return _solver
+
+
 # Основные функции плагина (как у Ле Шателье)
 def solve_ionic_equation(equation: str) -> Dict:
     """
@@ -389,8 +436,7 @@ def solve_ionic_equation(equation: str) -> Dict:
     Returns:
         Словарь с результатами
     """
-    solver = IonicEquationSolver()
-    return solver.solve_ionic_equation(equation)
+    return get_solver().solve_ionic_equation(equation)
 
 
 def get_example_equations() -> List[Dict]:
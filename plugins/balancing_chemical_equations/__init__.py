@@ -1,12 +1,272 @@
+import re
+from fractions import Fraction
+from itertools import product
+from math import gcd, lcm
+from typing import Dict, List, Optional, Tuple
+
 PLUGIN_CONFIG = {
     'name': 'Балансировщик химических уравнений',
     'description': 'Автоматическая балансировка химических уравнений с проверкой баланса атомов',
     'icon': 'balance-scale',
     'version': '1.0.0',
     'enabled': True,
-    'route': '/plugin/balancing_chemical_equations'
+    'route': '/plugin/balancing_chemical_equations',
+    'handlers': [
+        {'method': 'POST', 'params': ['equation'], 'handler': 'balance_equation',
+         'normalize': 'ordered_equation', 'cacheable': True, 'batch': 'equations'}
+    ]
 }
 
+ARROWS = re.compile(r'\s*(?:=|→|->|⟶|⇄|⇌)\s*')
+# '+' между веществами: за ним идёт начало формулы, а не пробел перед
+# следующим '+' или стрелкой, как у заряда иона (Fe2+ + MnO4-)
+COMPOUND_SEPARATOR = re.compile(r'\s*\+(?=\s*[A-Z(\[\d])\s*')
+MAX_MULTIPLIER = 10  # наибольший множитель вектора базиса при поиске решения
+SEARCH_LIMIT = 1000  # наибольшее число комбинаций за весь перебор
+
+# Общий разборщик формул
+try:
+    from plugins.formula import FormulaError, parse_formula
+except ImportError:
+    from formula import FormulaError, parse_formula
+
+
+def parse_equation(equation: str) -> Tuple[List[str], List[str]]:
+    """Разделяет уравнение на реагенты и продукты"""
+    sides = ARROWS.split(equation.strip())
+    if len(sides) != 2:
+        raise FormulaError('Нужна одна стрелка')
+    reactants = [s.strip() for s in COMPOUND_SEPARATOR.split(sides[0]) if s.strip()]
+    products = [s.strip() for s in COMPOUND_SEPARATOR.split(sides[1]) if s.strip()]
+    if not reactants or not products:
+        raise FormulaError('Нет реагентов или продуктов')
+    return reactants, products
+
+
+def null_space(matrix: List[List[int]], columns: int) -> List[List[int]]:
+    """
+    Целочисленный базис ядра матрицы
+
+    Бездробное исключение Гаусса-Жордана: строки комбинируются только
+    целочисленным умножением и сокращаются на НОД, поэтому вычисления точные
+    и без округлений. Каждый вектор базиса - взаимно простые целые числа.
+    """
+    rows = [list(row) for row in matrix]
+    pivots = []
+    rank = 0
+    for column in range(columns):
+        pivot = next((r for r in range(rank, len(rows)) if rows[r][column]), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        pivot_row = rows[rank]
+        lead = pivot_row[column]
+        for r in range(len(rows)):
+            factor = rows[r][column]
+            if r != rank and factor:
+                rows[r] = reduce_row([lead * a - factor * b for a, b in zip(rows[r], pivot_row)])
+        pivots.append((rank, column))
+        rank += 1
+        if rank == len(rows):
+            break
+
+    pivot_columns = {column for _, column in pivots}
+    scale = 1
+    for row, column in pivots:
+        lead = abs(rows[row][column])
+        scale = scale * lead // gcd(scale, lead)
+
+    basis = []
+    for free in range(columns):
+        if free in pivot_columns:
+            continue
+        vector = [0] * columns
+        vector[free] = scale
+        for row, column in pivots:
+            vector[column] = -rows[row][free] * scale // rows[row][column]
+        basis.append(reduce_row(vector))
+    return basis
+
+
+def reduce_row(values: List[int]) -> List[int]:
+    """Сокращает целочисленный вектор на НОД его элементов"""
+    divisor = 0
+    for v in values:
+        divisor = gcd(divisor, v)
+    return [v // divisor for v in values] if divisor > 1 else values
+
+
+def positive_solution(basis: List[List[int]], matrix: List[List[int]]) -> Optional[List[int]]:
+    """
+    Решение с положительными коэффициентами из базиса ядра
+
+    Сначала перебирает целые комбинации векторов базиса с множителями от -m
+    до m, увеличивая m, и берёт решение с наименьшей суммой коэффициентов;
+    весь перебор (по всем m) ограничен SEARCH_LIMIT комбинациями. Если
+    перебор ничего не нашёл, решение ищет simplex_positive().
+    """
+    oriented = [v if sum(v) > 0 else [-x for x in v] for v in basis]
+    for vector in oriented:
+        if all(x > 0 for x in vector):
+            return vector
+    if len(oriented) < 2 or not all(any(column) for column in zip(*oriented)):
+        return None  # вещество, которое входит во все решения с нулём
+
+    budget = SEARCH_LIMIT
+    for bound in range(1, MAX_MULTIPLIER + 1):
+        budget -= (2 * bound + 1) ** len(oriented)
+        if budget < 0:
+            break
+        best = None
+        for multipliers in product(range(-bound, bound + 1), repeat=len(oriented)):
+            if max(abs(m) for m in multipliers) != bound:
+                continue  # уже проверено на меньшем m
+            combined = [sum(m * v[i] for m, v in zip(multipliers, oriented))
+                        for i in range(len(oriented[0]))]
+            if all(x > 0 for x in combined):
+                combined = reduce_row(combined)
+                if best is None or sum(combined) < sum(best):
+                    best = combined
+        if best is not None:
+            return best
+    return simplex_positive(matrix, len(basis[0]))
+
+
+def simplex_positive(matrix: List[List[int]], columns: int) -> Optional[List[int]]:
+    """
+    Целое решение matrix·x = 0 с x ≥ 1 или None, если его нет
+
+    Первая фаза симплекс-метода в точных дробях: после замены x = 1 + y
+    ищется допустимая точка A·y = -A·1, y ≥ 0 с искусственными
+    переменными; правило Бленда исключает зацикливание.
+    """
+    tableau = []
+    for row in matrix:
+        rhs = -sum(row)
+        if rhs < 0:
+            row, rhs = [-a for a in row], -rhs
+        tableau.append([Fraction(a) for a in row])
+        tableau[-1].append(Fraction(rhs))
+    size = len(tableau)
+    for i, row in enumerate(tableau):
+        row[columns:columns] = [Fraction(int(i == j)) for j in range(size)]
+    basis = list(range(columns, columns + size))
+    width = columns + size
+
+    while True:
+        costs = [int(j >= columns) - sum(tableau[i][j] for i in range(size) if basis[i] >= columns)
+                 for j in range(width)]
+        entering = next((j for j in range(width) if costs[j] < 0), None)
+        if entering is None:
+            break
+        candidates = [(tableau[i][-1] / tableau[i][entering], basis[i], i)
+                      for i in range(size) if tableau[i][entering] > 0]
+        if not candidates:
+            break
+        pivot = min(candidates)[2]
+        lead = tableau[pivot][entering]
+        tableau[pivot] = [a / lead for a in tableau[pivot]]
+        for i in range(size):
+            factor = tableau[i][entering]
+            if i != pivot and factor:
+                tableau[i] = [a - factor * b for a, b in zip(tableau[i], tableau[pivot])]
+        basis[pivot] = entering
+
+    if any(basis[i] >= columns and tableau[i][-1] for i in range(size)):
+        return None
+    x = [Fraction(1)] * columns
+    for i, column in enumerate(basis):
+        if column < columns:
+            x[column] += tableau[i][-1]
+    scale = lcm(*(v.denominator for v in x))
+    return reduce_row([int(v * scale) for v in x])
+
+
+def balance_equation(equation: str) -> Dict:
+    """
+    Балансирует химическое уравнение
+
+    Args:
+        equation: Уравнение вида "Fe + O2 = Fe2O3" (допускаются →, ->),
+            в том числе ионное: "Fe2+ + MnO4- + H+ = Fe3+ + Mn2+ + H2O"
+
+    Returns:
+        Словарь с коэффициентами, уравнением и проверкой баланса атомов
+    """
+    try:
+        reactants, products = parse_equation(equation)
+        compounds = reactants + products
+        parsed = [parse_formula(c) for c in compounds]
+        compositions = [p.symbols() for p in parsed]
+        charges = [p.charge for p in parsed]
+        elements = sorted({el for comp in compositions for el in comp})
+
+        matrix = []
+        for element in elements:
+            row = [comp.get(element, 0) for comp in compositions[:len(reactants)]]
+            row += [-comp.get(element, 0) for comp in compositions[len(reactants):]]
+            matrix.append(row)
+        if any(charges):
+            # Сохранение заряда
+            matrix.append(charges[:len(reactants)] + [-c for c in charges[len(reactants):]])
+
+        basis = null_space(matrix, len(compounds))
+        if not basis:
+            return {
+                'error': True,
+                'message': 'Уравнение невозможно сбалансировать'
+            }
+
+        coefficients = positive_solution(basis, matrix)
+        if coefficients is None:
+            return {
+                'error': True,
+                'message': 'Нет решения с положительными коэффициентами',
+                'unique': False,
+                'solutions': basis
+            }
+
+        def side(formulas, coeffs):
+            return ' + '.join(f'{c if c != 1 else ""}{f}' for f, c in zip(formulas, coeffs))
+
+        balance = []
+        for element in elements:
+            left = sum(comp.get(element, 0) * c for comp, c in
+                       zip(compositions[:len(reactants)], coefficients))
+            right = sum(comp.get(element, 0) * c for comp, c in
+                        zip(compositions[len(reactants):], coefficients[len(reactants):]))
+            balance.append({'element': element, 'left': left, 'right': right,
+                            'balanced': left == right})
+        charge_left = sum(q * c for q, c in zip(charges, coefficients[:len(reactants)]))
+        charge_right = sum(q * c for q, c in zip(charges[len(reactants):], coefficients[len(reactants):]))
+
+        return {
+            'error': False,
+            'equation': f'{side(reactants, coefficients)} → '
+                        f'{side(products, coefficients[len(reactants):])}',
+            'reactants': reactants,
+            'products': products,
+            'coefficients': coefficients,
+            'unique': len(basis) == 1,
+            'solutions': basis,
+            'elements': elements,
+            'balance': balance,
+            'charge': {'left': charge_left, 'right': charge_right,
+                       'balanced': charge_left == charge_right}
+        }
+
+    except FormulaError as e:
+        return {
+            'error': True,
+            'message': str(e)
+        }
+    except Exception as e:
+        return {
+            'error': True,
+            'message': f'Ошибка балансировки: {str(e)}'
+        }
+
+
 def get_content():
     """Return balancing equations plugin data"""
     return {
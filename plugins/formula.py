@@ -0,0 +1,183 @@
+"""
+Общий разборщик химических формул для плагинов
+
+Формула разбирается один раз на процесс: результат - неизменяемый и
+хешируемый ParsedFormula (отсортированный кортеж пар (номер элемента,
+количество) и заряд), который хранится в общем ограниченном кэше и
+используется плагинами ионных уравнений, балансировки и молярной массы.
+
+Грамматика:
+    formula := part ('·' part)* charge?
+    part    := number? group+
+    group   := (element | '(' group+ ')' | '[' group+ ']') number?
+    charge  := '^' number? sign | superscript* superscript_sign | sign
+
+Одноатомный ион с цифрами перед знаком (Fe2+, O2-) читается как заряд:
+Fe²⁺, а не Fe₂⁺; для многоатомных ионов заряд пишется через '^' (SO4^2-).
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+ELEMENTS_FILE = Path(__file__).resolve().parent.parent / 'data' / 'elements.json'
+FORMULA_CACHE_SIZE = 8192
+
+SUBSCRIPTS = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻', '0123456789+-')
+CHARGE = re.compile(r'(?:\^(\d*)([+-])|([⁰¹²³⁴⁵⁶⁷⁸⁹]*)([⁺⁻])|([+-]))$')
+TOKENS = re.compile(r'(?P<element>[A-Z][a-z]?)|(?P<number>\d+)|(?P<open>[(\[])'
+                    r'|(?P<close>[)\]])|(?P<hydrate>[·*.])|(?P<error>.)')
+MONATOMIC_ION = re.compile(r'([A-Z][a-z]?)(\d+)([+-])')
+CLOSING = {'(': ')', '[': ']'}
+
+
+class FormulaError(ValueError):
+    """Ошибка разбора формулы"""
+
+
+class ParsedFormula(NamedTuple):
+    """Состав формулы: ((номер элемента, количество), ...) и заряд"""
+    composition: Tuple[Tuple[int, int], ...]
+    charge: int
+
+    def symbols(self) -> Dict[str, int]:
+        """Состав с символами элементов: {'H': 2, 'O': 1}"""
+        return {element_symbol(number): count for number, count in self.composition}
+
+
+@lru_cache(maxsize=1)
+def load_elements() -> Dict[str, Dict]:
+    """Данные элементов из data/elements.json"""
+    with open(ELEMENTS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def _element_numbers() -> Tuple[Dict[str, int], Dict[int, str]]:
+    by_symbol = {symbol: data['number'] for symbol, data in load_elements().items()}
+    return by_symbol, {number: symbol for symbol, number in by_symbol.items()}
+
+
+def element_symbol(number: int) -> str:
+    return _element_numbers()[1][number]
+
+
+def element_data(number: int) -> Dict:
+    return load_elements()[element_symbol(number)]
+
+
+def split_charge(formula: str) -> Tuple[str, int]:
+    """Отделяет заряд от формулы: 'SO4^2-' → ('SO4', -2), 'Fe2+' → ('Fe', 2)"""
+    ion = MONATOMIC_ION.fullmatch(formula)
+    if ion:
+        symbol, digits, sign = ion.groups()
+        return symbol, int(digits) if sign == '+' else -int(digits)
+    match = CHARGE.search(formula)
+    if not match:
+        return formula, 0
+    caret_digits, caret_sign, super_digits, super_sign, bare_sign = match.groups()
+    digits = caret_digits if caret_sign else (super_digits or '').translate(SUPERSCRIPTS)
+    sign = caret_sign or (super_sign or '').translate(SUPERSCRIPTS) or bare_sign
+    magnitude = int(digits) if digits else 1
+    return formula[:match.start()], magnitude if sign == '+' else -magnitude
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """Разбивает формулу на лексемы (вид, текст)"""
+    tokens = []
+    for match in TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind == 'error':
+            raise FormulaError(f'Недопустимый символ "{match.group()}" в формуле {text}')
+        tokens.append((kind, match.group()))
+    return tokens
+
+
+class _Parser:
+    """Рекурсивный спуск по лексемам формулы"""
+
+    def __init__(self, formula: str, tokens: List[Tuple[str, str]]):
+        self.formula = formula
+        self.tokens = tokens
+        self.position = 0
+        self.numbers = _element_numbers()[0]
+
+    def peek(self) -> str:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else ''
+
+    def take(self) -> str:
+        self.position += 1
+        return self.tokens[self.position - 1][1]
+
+    def count(self) -> int:
+        if self.peek() != 'number':
+            return 1
+        count = int(self.take())
+        if count == 0:
+            raise FormulaError(f'Нулевой индекс в формуле {self.formula}')
+        return count
+
+    def formula_(self) -> Dict[int, int]:
+        counts = self.part()
+        while self.peek() == 'hydrate':
+            self.take()
+            for number, n in self.part().items():
+                counts[number] = counts.get(number, 0) + n
+        if self.position != len(self.tokens):
+            kind = self.peek()
+            if kind == 'close':
+                raise FormulaError(f'Лишняя закрывающая скобка в формуле {self.formula}')
+            raise FormulaError(f'Неожиданное число в формуле {self.formula}')
+        return counts
+
+    def part(self) -> Dict[int, int]:
+        multiplier = self.count()
+        counts = self.groups()
+        if not counts:
+            raise FormulaError(f'Пустая формула: {self.formula}')
+        return {number: n * multiplier for number, n in counts.items()}
+
+    def groups(self) -> Dict[int, int]:
+        counts = {}
+        while self.peek() in ('element', 'open'):
+            for number, n in self.group().items():
+                counts[number] = counts.get(number, 0) + n
+        return counts
+
+    def group(self) -> Dict[int, int]:
+        if self.peek() == 'element':
+            symbol = self.take()
+            if symbol not in self.numbers:
+                raise FormulaError(f'Неизвестный элемент: {symbol}')
+            return {self.numbers[symbol]: self.count()}
+
+        bracket = self.take()
+        inner = self.groups()
+        if self.peek() != 'close' or self.take() != CLOSING[bracket]:
+            raise FormulaError(f'Незакрытая скобка в формуле {self.formula}')
+        if not inner:
+            raise FormulaError(f'Пустые скобки в формуле {self.formula}')
+        multiplier = self.count()
+        return {number: n * multiplier for number, n in inner.items()}
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def parse_formula(formula: str) -> ParsedFormula:
+    """
+    Разбирает формулу (H2SO4, Ca(OH)₂, CuSO4·5H2O, SO4^2-)
+
+    Результат кэшируется на процесс и общий для всех плагинов.
+    """
+    text, charge = split_charge(''.join(formula.split()))
+    text = text.translate(SUBSCRIPTS)
+    if not text:
+        raise FormulaError(f'Пустая формула: {formula}')
+    counts = _Parser(formula, tokenize(text)).formula_()
+    return ParsedFormula(tuple(sorted(counts.items())), charge)
+
+
+def cache_info():
+    """Статистика общего кэша формул"""
+    return parse_formula.cache_info()
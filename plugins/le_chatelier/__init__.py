@@ -6,7 +6,11 @@ PLUGIN_CONFIG = {
     'icon': 'scale-balanced',
     'version': '1.0.0',
     'enabled': True,
-    'route': '/plugin/le-chatelier'
+    'route': '/plugin/le-chatelier',
+    'handlers': [
+        {'method': 'GET', 'params': ['equation'], 'handler': 'calculate_equilibrium',
+         'normalize': 'whitespace', 'cacheable': True}
+    ]
 }
 
 def parse_side(side_str):
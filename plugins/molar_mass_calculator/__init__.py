@@ -1,12 +1,74 @@
+from typing import Dict
+
 PLUGIN_CONFIG = {
     'name': 'Калькулятор молярной массы',
     'description': 'Расчет молярной массы вещества по химической формуле',
     'icon': 'weight-scale',
     'version': '1.0.0',
     'enabled': True,
-    'route': '/plugin/molar_mass_calculator'
+    'route': '/plugin/molar_mass_calculator',
+    'handlers': [
+        {'method': 'POST', 'params': ['formula'], 'handler': 'calculate_molar_mass',
+         'normalize': 'formula', 'cacheable': True, 'batch': 'formulas'}
+    ]
 }
 
+ELECTRON_MASS = 0.000548579909  # а.е.м.
+
+# Общий разборщик формул
+try:
+    from plugins.formula import FormulaError, element_data, parse_formula
+except ImportError:
+    from formula import FormulaError, element_data, parse_formula
+
+
+def calculate_molar_mass(formula: str) -> Dict:
+    """
+    Рассчитывает молярную массу и массовые доли элементов
+
+    Args:
+        formula: Химическая формула (H2SO4, CuSO4·5H2O, SO4^2-)
+
+    Returns:
+        Словарь с молярной массой (г/моль) и составом
+    """
+    try:
+        composition, charge = parse_formula(formula.strip())
+        elements = [element_data(number) for number, _ in composition]
+
+        masses = [(el['symbol'], el['name'], count, el['mass'] * count)
+                  for el, (_, count) in zip(elements, composition)]
+        total = sum(mass for _, _, _, mass in masses) - charge * ELECTRON_MASS
+
+        return {
+            'error': False,
+            'formula': formula.strip(),
+            'charge': charge,
+            'molar_mass': round(total, 4),
+            'composition': [
+                {
+                    'element': symbol,
+                    'name': name,
+                    'count': count,
+                    'mass': round(mass, 4),
+                    'percent': round(mass / total * 100, 2)
+                }
+                for symbol, name, count, mass in masses
+            ]
+        }
+
+    except FormulaError as e:
+        return {
+            'error': True,
+            'message': str(e)
+        }
+    except Exception as e:
+        return {
+            'error': True,
+            'message': f'Ошибка расчета: {str(e)}'
+        }
+
+
 def get_content():
     """Return molar mass calculator plugin data"""
     return {
@@ -1,4 +1,8 @@
+import json
+import math
 import re
+from array import array
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 
 PLUGIN_CONFIG = {
@@ -7,7 +11,17 @@ PLUGIN_CONFIG = {
     'icon': 'flask-vial',
     'version': '2.0.0',
     'enabled': True,
-    'route': '/plugin/solubility_table'
+    'route': '/plugin/solubility_table',
+    'handlers': [
+        {'method': 'GET', 'params': ['q'], 'optional': {'offset': 0, 'limit': 20},
+         'handler': 'search_compound'},
+        {'method': 'GET', 'match': {'view': 'table'}, 'handler': 'get_full_table_json',
+         'response': 'payload'},
+        {'method': 'GET', 'params': ['cation', 'anion'], 'handler': 'check_solubility',
+         'not_found': 'Unknown ion'},
+        {'method': 'GET', 'params': ['cation'], 'handler': 'get_row', 'not_found': 'Unknown ion'},
+        {'method': 'GET', 'params': ['anion'], 'handler': 'get_column', 'not_found': 'Unknown ion'}
+    ]
 }
 
 SOLUBILITY_DATA = {
@@ -42,7 +56,7 @@ SOLUBILITY_DATA = {
     'I⁻': {'name': 'Иодид', 'color': '#FDA7DF'},
     'S²⁻': {'name': 'Сульфид', 'color': '#ED4C67'},
     'HS⁻': {'name': 'Гидросульфид', 'color': '#B53471'},
-    'NO₃': {'name': 'Нитрат', 'color': '#833471'},
+    'NO₃⁻': {'name': 'Нитрат', 'color': '#833471'},
     'SO₃²⁻': {'name': 'Сульфит', 'color': '#006266'},
     'SO₄²⁻': {'name': 'Сульфат', 'color': '#5758BB'},
     'S₂O₃²⁻': {'name': 'Тиосульфат', 'color': '#12CBC4'},
@@ -243,121 +257,261 @@ SOLUBILITY_MATRIX = {
     'Pb²⁺ + CH₃COO⁻': {'sol': 'р', 'desc': 'Растворим', 'color': '#1ABC9C'}
 }
 
+# --- Компиляция матрицы в плотную таблицу катион × анион ---
+
+CATIONS = tuple(ion for ion in SOLUBILITY_DATA if ion.endswith('⁺'))
+ANIONS = tuple(ion for ion in SOLUBILITY_DATA if ion.endswith('⁻'))
+CATION_IDS = {ion: i for i, ion in enumerate(CATIONS)}
+ANION_IDS = {ion: i for i, ion in enumerate(ANIONS)}
+
+# Значение ячейки без данных: (код, описание, цвет)
+NO_DATA = ('?', 'Нет данных', '#95A5A6')
+
+SUPERSCRIPT_DIGITS = str.maketrans('¹²³⁴⁵⁶⁷⁸⁹', '123456789')
+SUBSCRIPT_DIGITS = str.maketrans('0123456789', '₀₁₂₃₄₅₆₇₈₉')
+SPECIAL_FORMULAS = {('H⁺', 'OH⁻'): 'H₂O'}
+
+
+def ion_charge(ion: str) -> int:
+    """Заряд иона по надстрочной записи: 'SO₄²⁻' → 2"""
+    digits = ion.rstrip('⁺⁻')[len(ion_base(ion)):].translate(SUPERSCRIPT_DIGITS)
+    return int(digits) if digits else 1
+
+
+def ion_base(ion: str) -> str:
+    """Ион без заряда: 'SO₄²⁻' → 'SO₄'"""
+    return ion.rstrip('⁺⁻¹²³⁴⁵⁶⁷⁸⁹')
+
+
+def compose_formula(cation: str, anion: str) -> str:
+    """Формула соли по паре ионов с учетом зарядов: Al³⁺ + SO₄²⁻ → Al₂(SO₄)₃"""
+    if (cation, anion) in SPECIAL_FORMULAS:
+        return SPECIAL_FORMULAS[(cation, anion)]
+    q_cation, q_anion = ion_charge(cation), ion_charge(anion)
+    common = math.gcd(q_cation, q_anion)
+    parts = []
+    for base, count in ((ion_base(cation), q_anion // common), (ion_base(anion), q_cation // common)):
+        if count == 1:
+            parts.append(base)
+        else:
+            polyatomic = sum(ch.isupper() for ch in base) > 1
+            parts.append((f'({base})' if polyatomic else base) + str(count).translate(SUBSCRIPT_DIGITS))
+    return ''.join(parts)
+
+
+def _compile_grid() -> Tuple[array, Tuple]:
+    """Плотная таблица с номерами интернированных значений ячеек"""
+    codes = {NO_DATA: 0}
+    grid = array('B', bytes(len(CATIONS) * len(ANIONS)))
+    for pair, data in SOLUBILITY_MATRIX.items():
+        cation, anion = pair.split(' + ')
+        code = (data['sol'], data['desc'], data['color'])
+        if code not in codes:
+            codes[code] = len(codes)
+        grid[CATION_IDS[cation] * len(ANIONS) + ANION_IDS[anion]] = codes[code]
+    return grid, tuple(codes)
+
+
+SOLUBILITY_GRID, SOLUBILITY_CODES = _compile_grid()
+FORMULAS = tuple(compose_formula(cation, anion) for cation in CATIONS for anion in ANIONS)
+
+
+def _cell(cation_id: int, anion_id: int) -> Dict:
+    index = cation_id * len(ANIONS) + anion_id
+    sol, desc, color = SOLUBILITY_CODES[SOLUBILITY_GRID[index]]
+    anion = ANIONS[anion_id]
+    return {
+        'anion': anion,
+        'anion_name': SOLUBILITY_DATA[anion]['name'],
+        'solubility': sol,
+        'description': desc,
+        'color': color,
+        'formula': FORMULAS[index]
+    }
+
+
+def check_solubility(cation: str, anion: str) -> Optional[Dict]:
+    """Растворимость одной пары ионов или None для неизвестных ионов"""
+    if cation not in CATION_IDS or anion not in ANION_IDS:
+        return None
+    return {'cation': cation, **_cell(CATION_IDS[cation], ANION_IDS[anion])}
+
+
+def get_row(cation: str) -> Optional[List[Dict]]:
+    """Растворимость солей катиона со всеми анионами"""
+    if cation not in CATION_IDS:
+        return None
+    cation_id = CATION_IDS[cation]
+    return [_cell(cation_id, anion_id) for anion_id in range(len(ANIONS))]
+
+
+def get_column(anion: str) -> Optional[List[Dict]]:
+    """Растворимость солей аниона со всеми катионами"""
+    if anion not in ANION_IDS:
+        return None
+    anion_id = ANION_IDS[anion]
+    return [{'cation': cation, **_cell(cation_id, anion_id)}
+            for cation_id, cation in enumerate(CATIONS)]
+
+
 def generate_full_table() -> Dict:
     """Генерирует полную таблицу растворимости"""
-    try:
-        # Сортируем катионы и анионы
-        cations = sorted([k for k in SOLUBILITY_DATA.keys() if '+' in k])
-        anions = sorted([k for k in SOLUBILITY_DATA.keys() if '-' in k])
+    table_data = []
 
-        table_data = []
+    # Для каждого катиона
+    for cation_id, cation in enumerate(CATIONS):
+        table_data.append({
+            'cation': cation,
+            'cation_name': SOLUBILITY_DATA[cation]['name'],
+            'cation_color': SOLUBILITY_DATA[cation]['color'],
+            'anions': [_cell(cation_id, anion_id) for anion_id in range(len(ANIONS))]
+        })
 
-        # Для каждого катиона
-        for cation in cations:
-            row = {
-                'cation': cation,
-                'cation_name': SOLUBILITY_DATA[cation]['name'],
-                'cation_color': SOLUBILITY_DATA[cation]['color'],
-                'anions': []
-            }
+    # Общие правила растворимости
+    rules = [
+        'Все нитраты (NO₃⁻) растворимы',
+        'Все соли натрия, калия, аммония растворимы',
+        'Хлориды, бромиды, иодиды растворимы, кроме Ag⁺, Pb²⁺, Hg₂²⁺',
+        'Сульфаты растворимы, кроме Ba²⁺, Pb²⁺, Ca²⁺ (малорастворим)',
+        'Карбонаты, фосфаты, сульфиты нерастворимы, кроме Na⁺, K⁺, NH₄⁺',
+        'Гидроксиды нерастворимы, кроме Na⁺, K⁺, Ba²⁺, Ca²⁺ (малорастворим)'
+    ]
 
-            # Для каждого аниона
-            for anion in anions:
-                key = (cation, anion)
-                if key in SOLUBILITY_MATRIX:
-                    data = SOLUBILITY_MATRIX[key]
-                    row['anions'].append({
-                        'anion': anion,
-                        'anion_name': SOLUBILITY_DATA[anion]['name'],
-                        'solubility': data['sol'],
-                        'description': data['desc'],
-                        'color': data['color'],
-                        'formula': f'{cation[:-1]}{anion.replace("-", "")}'
-                    })
-                else:
-                    row['anions'].append({
-                        'anion': anion,
-                        'anion_name': SOLUBILITY_DATA[anion]['name'],
-                        'solubility': '?',
-                        'description': 'Нет данных',
-                        'color': '#95A5A6',
-                        'formula': f'{cation[:-1]}{anion.replace("-", "")}'
-                    })
-
-            table_data.append(row)
-
-        # Общие правила растворимости
-        rules = [
-            'Все нитраты (NO₃⁻) растворимы',
-            'Все соли натрия, калия, аммония растворимы',
-            'Хлориды, бромиды, иодиды растворимы, кроме Ag⁺, Pb²⁺, Hg₂²⁺',
-            'Сульфаты растворимы, кроме Ba²⁺, Pb²⁺, Ca²⁺ (малорастворим)',
-            'Карбонаты, фосфаты, сульфиты нерастворимы, кроме Na⁺, K⁺, NH₄⁺',
-            'Гидроксиды нерастворимы, кроме Na⁺, K⁺, Ba²⁺, Ca²⁺ (малорастворим)'
-        ]
+    return {
+        'error': False,
+        'cations': list(CATIONS),
+        'anions': list(ANIONS),
+        'table': table_data,
+        'rules': rules,
+        'total_compounds': len(CATIONS) * len(ANIONS),
+        'legend': {
+            'р': {'text': 'Растворим', 'color': '#1ABC9C'},
+            'м': {'text': 'Малорастворим', 'color': '#F1C40F'},
+            'н': {'text': 'Нерастворим', 'color': '#E74C3C'},
+            '?': {'text': 'Нет данных', 'color': '#95A5A6'}
+        }
+    }
 
-        return {
-            'error': False,
-            'cations': cations,
-            'anions': anions,
-            'table': table_data,
-            'rules': rules,
-            'total_compounds': len(cations) * len(anions),
-            'legend': {
-                'р': {'text': 'Растворим', 'color': '#1ABC9C'},
-                'м': {'text': 'Малорастворим', 'color': '#F1C40F'},
-                'н': {'text': 'Нерастворим', 'color': '#E74C3C'},
-                '?': {'text': 'Нет данных', 'color': '#95A5A6'}
+
+@lru_cache(maxsize=1)
+def get_full_table_json() -> bytes:
+    """Полная таблица, сериализованная в JSON один раз"""
+    return json.dumps(generate_full_table(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# --- Поисковый индекс ---
+
+ASCII_CHARGES = str.maketrans('₀₁₂₃₄₅₆₇₈₉⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻', '01234567890123456789+-', '^')
+CHARGE_SUFFIX = re.compile(r'\s+(?=\d*[+-](?:\s|$))')
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+
+def normalize_search_term(text: str) -> str:
+    """Нижний регистр, обычные цифры и знаки заряда: 'SO₄²⁻' → 'so42-'"""
+    return text.lower().translate(ASCII_CHARGES).replace('ё', 'е')
+
+
+def _build_search_index() -> Tuple[Tuple, Dict, Dict, Dict]:
+    """Индекс префиксов и триграмм по формулам, зарядам и названиям ионов"""
+    entries = []
+    prefixes = {}
+    trigrams = {}
+    terms = {}
+    for cation_id, cation in enumerate(CATIONS):
+        for anion_id, anion in enumerate(ANIONS):
+            index = cation_id * len(ANIONS) + anion_id
+            if not SOLUBILITY_GRID[index]:
+                continue
+            entry_id = len(entries)
+            entries.append(index)
+            entry_terms = {
+                normalize_search_term(FORMULAS[index]),
+                FORMULAS[index].lower(),
+                normalize_search_term(cation),
+                normalize_search_term(anion),
             }
-        }
+            for name in (SOLUBILITY_DATA[cation]['name'], SOLUBILITY_DATA[anion]['name']):
+                entry_terms.update(normalize_search_term(word) for word in re.findall(r'\w+', name))
+            terms[entry_id] = tuple(entry_terms)
+            for term in entry_terms:
+                for end in range(1, len(term) + 1):
+                    prefixes.setdefault(term[:end], set()).add(entry_id)
+                for start in range(len(term) - 2):
+                    trigrams.setdefault(term[start:start + 3], set()).add(entry_id)
+    return tuple(entries), prefixes, trigrams, terms
+
+
+SEARCH_ENTRIES, SEARCH_PREFIXES, SEARCH_TRIGRAMS, SEARCH_TERMS = _build_search_index()
 
-    except Exception as e:
-        return {
-            'error': True,
-            'message': f'Ошибка генерации таблицы: {str(e)}'
-        }
 
+def _match_word(word: str) -> Dict[int, int]:
+    """Записи, подходящие под слово запроса, с рангом: 0 - точное, 1 - префикс, 2 - подстрока"""
+    matches = {}
+    for entry_id in SEARCH_PREFIXES.get(word, ()):
+        matches[entry_id] = 0 if word in SEARCH_TERMS[entry_id] else 1
+    if len(word) >= 3:
+        candidates = None
+        for start in range(len(word) - 2):
+            found = SEARCH_TRIGRAMS.get(word[start:start + 3], set())
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                break
+        for entry_id in candidates or ():
+            if entry_id not in matches and any(word in term for term in SEARCH_TERMS[entry_id]):
+                matches[entry_id] = 2
+    return matches
 
-def search_compound(query: str) -> Dict:
-    """Поиск соединения по формуле или названию"""
+
+@lru_cache(maxsize=1024)
+def _ranked_matches(query: str) -> Tuple[int, ...]:
+    """Индексы ячеек таблицы, упорядоченные по релевантности"""
+    scores = None
+    for word in query.split():
+        matches = _match_word(word)
+        if scores is None:
+            scores = matches
+        else:
+            scores = {i: scores[i] + rank for i, rank in matches.items() if i in scores}
+        if not scores:
+            return ()
+    if not scores:
+        return ()
+    ranked = sorted(scores, key=lambda i: (scores[i], len(FORMULAS[SEARCH_ENTRIES[i]]),
+                                           FORMULAS[SEARCH_ENTRIES[i]]))
+    return tuple(SEARCH_ENTRIES[i] for i in ranked)
+
+
+def search_compound(query: str, offset: int = 0, limit: int = SEARCH_PAGE_SIZE) -> Dict:
+    """Поиск соединения по формуле, заряду или названию ионов"""
     try:
-        query = query.lower().strip()
-        results = []
+        query = normalize_search_term(query.strip())
+        query = CHARGE_SUFFIX.sub('', query)  # 'so4 2-' → 'so42-'
+        offset = max(offset, 0)
+        limit = min(max(limit, 1), SEARCH_MAX_PAGE_SIZE)
+        matches = _ranked_matches(query)
 
-        # Ищем в матрице растворимости
-        for (cation, anion), data in SOLUBILITY_MATRIX.items():
-            cation_name = SOLUBILITY_DATA[cation]['name'].lower()
-            anion_name = SOLUBILITY_DATA[anion]['name'].lower()
-
-            # Генерируем возможные формулы
-            formulas = []
-            if cation == 'NH4+':
-                formulas.append(f'(nh4){anion.replace("-", "").lower()}')
-                formulas.append(f'nh4{anion.replace("-", "").lower()}')
-            else:
-                cation_part = cation.lower().replace('+', '')
-                anion_part = anion.lower().replace('-', '').replace('^', '')
-                formulas.append(f'{cation_part}{anion_part}')
-                formulas.append(f'{cation_part}{anion_part}'.replace('2', '₂').replace('3', '₃'))
-
-            # Проверяем совпадение
-            for formula in formulas:
-                if query in formula or query in cation_name or query in anion_name:
-                    results.append({
-                        'cation': cation,
-                        'anion': anion,
-                        'formula': formula.upper(),
-                        'solubility': data['sol'],
-                        'description': data['desc'],
-                        'color': data['color']
-                    })
-                    break
+        results = []
+        for index in matches[offset:offset + limit]:
+            cation = CATIONS[index // len(ANIONS)]
+            anion = ANIONS[index % len(ANIONS)]
+            sol, desc, color = SOLUBILITY_CODES[SOLUBILITY_GRID[index]]
+            results.append({
+                'cation': cation,
+                'anion': anion,
+                'formula': FORMULAS[index],
+                'solubility': sol,
+                'description': desc,
+                'color': color
+            })
 
         return {
             'error': False,
             'query': query,
-            'results': results[:20],  # Ограничиваем 20 результатами
-            'count': len(results)
+            'results': results,
+            'count': len(matches),
+            'offset': offset,
+            'limit': limit
         }
 
     except Exception as e:
@@ -379,8 +533,8 @@ def get_content():
             'rules': True
         },
         'statistics': {
-            'cations': len([k for k in SOLUBILITY_DATA.keys() if '+' in k]),
-            'anions': len([k for k in SOLUBILITY_DATA.keys() if '-' in k]),
-            'compounds': len(SOLUBILITY_MATRIX)
+            'cations': len(CATIONS),
+            'anions': len(ANIONS),
+            'compounds': sum(1 for code in SOLUBILITY_GRID if code)
         }
     }
\ No newline at end of file
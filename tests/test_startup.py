@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / 'data'
+
+
+def snapshot():
+    return {path.relative_to(DATA_DIR): path.read_bytes() if path.is_file() else None
+            for path in DATA_DIR.rglob('*')}
+
+
+def test_import_does_not_write_data():
+    """Importing app (tests, CLI, benchmarks) must not migrate or create data files"""
+    before = snapshot()
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=ROOT, check=True)
+    assert snapshot() == before